@@ -1,17 +1,29 @@
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
+from metrics_cube import rollup
+from schema import to_bool
 
-def calculate_budget_allocations(df, total_budget):
-    # Normalize Converted column
-    df['Converted'] = df['Converted'].astype(str).str.strip().str.upper()
-    df['Converted'] = df['Converted'] == 'TRUE'
+DEFAULT_ELASTICITY = 0.7        # used when a source has too little history to fit
+ELASTICITY_BOUNDS = (0.1, 0.95)  # keep every curve concave (diminishing returns)
+BOOTSTRAP_CELLS = 4_000_000      # max resample-weight cells held in memory at once
+EXACT_BOOTSTRAP_MAX_LEADS = 200  # larger sources use the normal limit of the bootstrap
+PARALLEL_BOOTSTRAP_CELLS = 50_000_000  # below this many draws (~1 s) a process pool costs more than it saves
 
-    # Filter only converted leads
-    df_filtered = df[df['Converted'] == True]
+# Input of calculate_budget_allocations / bootstrap_cpa; both only use converted leads
+ALLOCATION_COLUMNS = ['Lead Source', 'Cost', 'Converted', 'Converted Count']
+CONVERTED_ONLY = [('Converted', '==', True)]
+
+def calculate_budget_allocations(df, total_budget):
+    # Filter only converted leads (already bool after schema.normalize_leads)
+    df_filtered = df[to_bool(df['Converted'])]
 
     if df_filtered.empty:
         return pd.DataFrame(), 0, 0
 
-    grouped = df_filtered.groupby('Lead Source').agg({
+    grouped = df_filtered.groupby('Lead Source', observed=True).agg({
         'Cost': 'sum',
         'Converted Count': 'sum'
     }).reset_index()
@@ -36,6 +48,190 @@ def calculate_budget_allocations(df, total_budget):
     return grouped, grouped['Uniform Predicted Conversions'].sum(), grouped['Weighted Predicted Conversions'].sum()
 
 
+def fit_response_curves(cube, min_points=3):
+    # conversions = a * spend ** b per Lead Source, fitted in log space on the
+    # monthly (cost, conversions) history from the metrics cube
+    monthly = rollup(cube, ['Lead Source', 'Month-Year'])
+    monthly = monthly[(monthly['cost'] > 0) & (monthly['conversions'] > 0)]
+    monthly = monthly.assign(log_cost=np.log(monthly['cost']), log_conv=np.log(monthly['conversions']))
+
+    stats = monthly.groupby('Lead Source', observed=True).agg(
+        points=('log_cost', 'size'),
+        mean_x=('log_cost', 'mean'),
+        mean_y=('log_conv', 'mean'),
+        var_x=('log_cost', 'var'),
+    )
+    monthly = monthly.join(stats[['mean_x', 'mean_y']], on='Lead Source')
+    cov = ((monthly['log_cost'] - monthly['mean_x']) * (monthly['log_conv'] - monthly['mean_y'])) \
+        .groupby(monthly['Lead Source'], observed=True).sum() / (stats['points'] - 1)
+
+    fitted = (stats['points'] >= min_points) & (stats['var_x'] > 0)
+    b = (cov / stats['var_x']).where(fitted, DEFAULT_ELASTICITY).clip(*ELASTICITY_BOUNDS)
+    a = np.exp(stats['mean_y'] - b * stats['mean_x'])
+
+    sources = rollup(cube, ['Lead Source'])[['Lead Source']]
+    curves = sources.join(pd.DataFrame({'a': a, 'b': b, 'points': stats['points']}), on='Lead Source')
+    curves['a'] = curves['a'].fillna(0.0)  # never converted: no predicted return
+    curves['b'] = curves['b'].fillna(DEFAULT_ELASTICITY)
+    curves['points'] = curves['points'].fillna(0).astype(int)
+    return curves.reset_index(drop=True)
+
+def predict_conversions(curves, spend):
+    return curves['a'].to_numpy() * np.power(np.maximum(spend, 0), curves['b'].to_numpy())
+
+def _bounds(curves, min_spend, max_spend):
+    n = len(curves)
+    mins = np.zeros(n) if min_spend is None else np.asarray(min_spend, dtype=float)
+    maxs = np.full(n, np.inf) if max_spend is None else np.asarray(max_spend, dtype=float)
+    return mins, np.maximum(maxs, mins)
+
+def _greedy_steps(curves, mins, maxs, budget, step):
+    # Greedy marginal-return allocation on a heap: each step of `step` dollars goes
+    # to the source with the largest gain. Concave curves make this optimal, and
+    # the sequence of picks is the optimal path for every smaller budget too.
+    a, b = curves['a'].to_numpy(), curves['b'].to_numpy()
+    spend = mins.copy()
+
+    def gain(i):
+        return a[i] * ((spend[i] + step) ** b[i] - spend[i] ** b[i])
+
+    heap = [(-gain(i), i) for i in range(len(curves)) if spend[i] + step <= maxs[i]]
+    heapq.heapify(heap)
+    picks = []
+    for _ in range(int(max(budget - mins.sum(), 0) // step)):
+        if not heap:
+            break
+        _, i = heapq.heappop(heap)
+        spend[i] += step
+        picks.append(i)
+        if spend[i] + step <= maxs[i]:
+            heapq.heappush(heap, (-gain(i), i))
+    return np.asarray(picks, dtype=np.int64)
+
+def allocation_grid(curves, max_budget, step=1000, min_spend=None, max_spend=None):
+    # Optimal allocations for every budget step..max_budget in one sweep.
+    # Returns (budgets, allocations) with allocations shaped (n_budgets, n_sources).
+    mins, maxs = _bounds(curves, min_spend, max_spend)
+    picks = _greedy_steps(curves, mins, maxs, max_budget, step)
+    budgets = np.arange(step, max_budget + step, step, dtype=float)
+
+    onehot = np.zeros((len(picks) + 1, len(curves)))
+    onehot[np.arange(1, len(picks) + 1), picks] = step
+    path = mins + np.cumsum(onehot, axis=0)  # row k: allocation after k greedy steps
+
+    floor = mins.sum()
+    k = np.clip(((budgets - floor) // step).astype(np.int64), 0, len(picks))
+    allocations = path[k]
+    # Budgets below the summed minimums can only be a scaled-down split of them
+    short = budgets < floor
+    if short.any() and floor > 0:
+        allocations[short] = mins * (budgets[short] / floor)[:, None]
+    return budgets, allocations
+
+def optimize_allocation(curves, total_budget, step=1000, min_spend=None, max_spend=None):
+    budgets, allocations = allocation_grid(curves, total_budget, step, min_spend, max_spend)
+    return allocation_frame(curves, allocations[-1])
+
+def allocation_frame(curves, allocation):
+    result = curves[['Lead Source']].copy()
+    result['Optimized Allocation'] = allocation
+    result['Optimized Predicted Conversions'] = predict_conversions(curves, allocation)
+    return result
+
+def _resample_sums(job):
+    # Bootstrap replicates of (total cost, total conversions) per source.
+    # Sources up to EXACT_BOOTSTRAP_MAX_LEADS are resampled exactly, all of them in
+    # one index draw per block of replicates; for larger ones the resampled sums
+    # are drawn from their normal limit, which matches the bootstrap there.
+    values, starts, sizes, n_boot, seed = job
+    rng = np.random.default_rng(seed)
+    sums = np.empty((n_boot, len(sizes), 2))
+
+    small = np.flatnonzero(sizes <= EXACT_BOOTSTRAP_MAX_LEADS)
+    for i in np.setdiff1d(np.arange(len(sizes)), small):
+        block = values[starts[i]:starts[i] + sizes[i]]
+        cov = np.cov(block, rowvar=False, bias=True) * len(block)
+        sums[:, i] = np.maximum(rng.multivariate_normal(block.sum(axis=0), cov, size=n_boot), 0)
+
+    if len(small):
+        # One slot per lead of the small sources; each slot redraws a lead of its own source
+        slot_start = np.repeat(starts[small], sizes[small])
+        slot_size = np.repeat(sizes[small], sizes[small])
+        offsets = np.concatenate([[0], np.cumsum(sizes[small])[:-1]])
+        chunk = max(1, min(n_boot, BOOTSTRAP_CELLS // max(len(slot_start), 1)))
+        for first in range(0, n_boot, chunk):
+            count = min(chunk, n_boot - first)
+            draws = rng.random((count, len(slot_start)), dtype=np.float32) * slot_size
+            idx = slot_start + np.minimum(draws.astype(np.int64), slot_size - 1)
+            sums[first:first + count, small, 0] = np.add.reduceat(values[:, 0][idx], offsets, axis=1)
+            sums[first:first + count, small, 1] = np.add.reduceat(values[:, 1][idx], offsets, axis=1)
+    return sums
+
+def bootstrap_cpa(df, n_boot=1000, seed=0, max_workers=None):
+    # Resampled CPA per Lead Source on the same converted leads as
+    # calculate_budget_allocations. Returns (sources, samples shaped (n_boot, n_sources)).
+    converted = df[to_bool(df['Converted'])]
+    codes, sources = pd.factorize(converted['Lead Source'], sort=True)
+    keep = codes >= 0
+    order = np.argsort(codes[keep], kind='stable')
+    values = np.column_stack([
+        converted['Cost'].fillna(0).to_numpy(float)[keep][order],
+        converted['Converted Count'].fillna(0).to_numpy(float)[keep][order],
+    ])
+    sizes = np.bincount(codes[keep], minlength=len(sources))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    if not len(sources):
+        return [], np.empty((n_boot, 0))
+
+    # Replicates are split into blocks with independent seeds, optionally across
+    # processes when there is enough work to pay for starting them
+    small = sizes <= EXACT_BOOTSTRAP_MAX_LEADS
+    cells = n_boot * (sizes[small].sum() + (~small).sum())
+    workers = max_workers if max_workers and max_workers > 1 and cells >= PARALLEL_BOOTSTRAP_CELLS else 1
+    blocks = [len(b) for b in np.array_split(np.arange(n_boot), workers) if len(b)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    jobs = [(values, starts, sizes, n, s) for n, s in zip(blocks, seeds)]
+    if len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sums = np.concatenate(list(pool.map(_resample_sums, jobs)))
+    else:
+        sums = _resample_sums(jobs[0])
+
+    cpa = np.full(sums.shape[:2], np.inf)
+    np.divide(sums[..., 0], sums[..., 1], out=cpa, where=sums[..., 1] > 0)
+    return list(sources), cpa
+
+def bootstrap_intervals(sources, cpa, total_budget, ci=0.9):
+    # Confidence intervals for CPA, allocations and predicted conversions at one
+    # budget; the resampled CPAs are reused across budgets
+    lo, hi = (1 - ci) / 2, 1 - (1 - ci) / 2
+    efficiency = np.where(np.isfinite(cpa), 1 / cpa, 0.0)  # conversions per dollar
+
+    uniform_predicted = (total_budget / max(len(sources), 1)) * efficiency
+    weight_sum = efficiency.sum(axis=1, keepdims=True)
+    weighted_allocation = np.divide(efficiency * total_budget, weight_sum,
+                                    out=np.zeros_like(efficiency), where=weight_sum > 0)
+    weighted_predicted = weighted_allocation * efficiency
+
+    def band(samples):
+        return np.nanquantile(samples, [lo, hi], axis=0)
+
+    cpa_band = band(np.where(np.isfinite(cpa), cpa, np.nan))
+    alloc_band = band(weighted_allocation)
+    pred_band = band(weighted_predicted)
+    per_source = pd.DataFrame({
+        'Lead Source': sources,
+        'CPA Low': cpa_band[0], 'CPA High': cpa_band[1],
+        'Weighted Allocation Low': alloc_band[0], 'Weighted Allocation High': alloc_band[1],
+        'Weighted Predicted Low': pred_band[0], 'Weighted Predicted High': pred_band[1],
+    })
+    totals = {
+        'Uniform Predicted Conversions': tuple(np.quantile(uniform_predicted.sum(axis=1), [lo, hi])),
+        'Weighted Predicted Conversions': tuple(np.quantile(weighted_predicted.sum(axis=1), [lo, hi])),
+    }
+    return per_source, totals
+
+
 
 """
 def calculate_budget_allocations(df, total_budget):
@@ -0,0 +1,129 @@
+# Cost/CPA/CPL/Net Pull Through anomalies for every segment at once. The cube is
+# pivoted into segments x months matrices per level (Lead Source, State, and
+# Lead Source x State); each month is scored against the median and MAD of the
+# WINDOW months before it, with all series handled by the same 2-D operations.
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from metrics_cube import rollup
+
+LEVELS = {
+    "Lead Source": ["Lead Source"],
+    "State": ["State"],
+    "Lead Source × State": ["Lead Source", "State"],
+}
+METRICS = ["Cost", "CPA", "CPL", "Net Pull Through (%)"]
+WINDOW = 6          # trailing months in each baseline
+MIN_HISTORY = 4     # months with data needed in the window before a month is scored
+THRESHOLD = 3.5     # |robust z| that raises an alert
+MIN_LEADS = 30      # months with fewer leads are too noisy to score
+MAD_FLOOR = 0.1     # scale never drops below 10% of the median, so flat series don't flag noise
+MAD_SCALE = 1.4826  # MAD -> standard deviation for normal data
+
+
+def series_matrix(monthly, by):
+    # Segment labels, month labels and segments x months arrays of the raw
+    # measures from a monthly roll-up; months with no leads are 0
+    frame = monthly.dropna(subset=by + ["Month-Year"])
+    if not len(frame):
+        return [], pd.PeriodIndex([], freq="M"), {}
+    # Month-Year labels are parsed once per distinct month, not per row
+    labels = frame["Month-Year"].astype("category")
+    periods = pd.PeriodIndex(labels.cat.categories.astype(str), freq="M")
+    month_numbers = (periods.year * 12 + periods.month - 1).to_numpy()[labels.cat.codes.to_numpy()]
+    first, last = int(month_numbers.min()), int(month_numbers.max())
+    months = pd.period_range(pd.Period(year=first // 12, month=first % 12 + 1, freq="M"),
+                             periods=last - first + 1, freq="M")
+    month_codes = month_numbers - first
+    keys = frame[by[0]].astype(str)
+    for col in by[1:]:
+        keys = keys + " · " + frame[col].astype(str)
+    segment_codes, segments = pd.factorize(keys, sort=True)
+    shape = (len(segments), len(months))
+    arrays = {}
+    for measure in ("leads", "conversions", "closed_won", "cost"):
+        values = np.zeros(shape)
+        np.add.at(values, (segment_codes, np.asarray(month_codes)), frame[measure].to_numpy(dtype=float))
+        arrays[measure] = values
+    return list(segments), months, arrays
+
+
+def metric_matrices(arrays, min_leads=MIN_LEADS):
+    leads, conversions = arrays["leads"], arrays["conversions"]
+    cost, closed_won = arrays["cost"], arrays["closed_won"]
+    enough = leads >= min_leads
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "Cost": np.where(enough, cost, np.nan),
+            "CPA": np.where(enough & (conversions > 0), cost / conversions, np.nan),
+            "CPL": np.where(enough, cost / leads, np.nan),
+            "Net Pull Through (%)": np.where(enough, closed_won * 100 / leads, np.nan),
+        }
+
+
+def _nanmedian(windows):
+    # NaNs sort last, so the median of the n observed values sits at positions
+    # (n - 1) // 2 and n // 2; no warnings for all-NaN windows, unlike np.nanmedian
+    ordered = np.sort(windows, axis=-1)
+    n = np.sum(~np.isnan(ordered), axis=-1)
+    lo = np.take_along_axis(ordered, np.maximum((n - 1) // 2, 0)[..., None], -1)[..., 0]
+    hi = np.take_along_axis(ordered, (n // 2)[..., None], -1)[..., 0]
+    return np.where(n > 0, (lo + hi) / 2, np.nan)
+
+
+def robust_z(values, window=WINDOW, min_history=MIN_HISTORY, floor=MAD_FLOOR):
+    # z of each month against the `window` months before it; NaN where the
+    # baseline has fewer than min_history observed months
+    segments, months = values.shape
+    median = np.full(values.shape, np.nan)
+    scale = np.full(values.shape, np.nan)
+    if months > window:
+        windows = sliding_window_view(values, window, axis=1)[:, :-1]  # baselines for months window..end
+        observed = np.sum(~np.isnan(windows), axis=2)
+        med = _nanmedian(windows)
+        mad = _nanmedian(np.abs(windows - med[..., None]))
+        mad = np.maximum(mad, floor * np.abs(med))
+        ready = observed >= min_history
+        median[:, window:] = np.where(ready, med, np.nan)
+        scale[:, window:] = np.where(ready & (mad > 0), MAD_SCALE * mad, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (values - median) / scale, median
+
+
+def detect_anomalies(cube, window=WINDOW, threshold=THRESHOLD, min_leads=MIN_LEADS, levels=LEVELS):
+    # One row per flagged (level, segment, month, metric), largest |z| first;
+    # Latest marks the last month in the data
+    found = []
+    levels = {level: by for level, by in levels.items() if set(by) <= set(cube.columns)}
+    keys = list(dict.fromkeys(col for by in levels.values() for col in by))
+    # One roll-up at the finest level; every level's matrices are built from it
+    monthly = rollup(cube, keys + ["Month-Year"])
+    for level, by in levels.items():
+        segments, months, arrays = series_matrix(monthly, by)
+        if not segments:
+            continue
+        labels = months.strftime("%Y-%m")
+        for metric, values in metric_matrices(arrays, min_leads).items():
+            z, median = robust_z(values, window)
+            seg, month = np.nonzero(np.abs(np.nan_to_num(z)) >= threshold)
+            if not len(seg):
+                continue
+            found.append(pd.DataFrame({
+                "Level": level,
+                "Segment": np.asarray(segments, dtype=object)[seg],
+                "Month": labels[month],
+                "Metric": metric,
+                "Value": values[seg, month].round(2),
+                "Baseline": median[seg, month].round(2),
+                "Robust Z": z[seg, month].round(2),
+                "Direction": np.where(z[seg, month] > 0, "spike", "drop"),
+                "Leads": arrays["leads"][seg, month].astype(int),
+                "Latest": month == len(months) - 1,
+            }))
+    if not found:
+        return pd.DataFrame(columns=["Level", "Segment", "Month", "Metric", "Value", "Baseline",
+                                     "Robust Z", "Direction", "Leads", "Latest"])
+    alerts = pd.concat(found, ignore_index=True)
+    order = np.argsort(-alerts["Robust Z"].abs().to_numpy(), kind="stable")
+    return alerts.iloc[order].reset_index(drop=True)
@@ -1,18 +1,97 @@
+import hashlib
+import threading
+import time
+
 import pandas as pd
 import streamlit as st
 from streamlit_gsheets import GSheetsConnection
 
+from tracing import count, span
+
+ALLOWLIST_TTL = 60        # seconds before a login triggers a background refresh
+ALLOWLIST_MAX_AGE = 300   # past this, the next login waits for a fresh read
+
 def get_connection():
     return st.connection("gsheets", type=GSheetsConnection, ttl = 0)
 
 def load_allowed_users():
     conn = get_connection()
-    df = conn.read(worksheet="userbase")
+    with span("conn.read", worksheet="userbase"):
+        df = conn.read(worksheet="userbase")
+    count("sheet_fetches")
     df = df.dropna(how="all")  # Removing completely empty rows 
     df["Email"] = df["Email"].astype(str).str.strip().str.lower() # strip spaces
     allowed_users = df[df["Active"] == 0]["Email"].tolist()
     return allowed_users
 
+def hash_email(email):
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()
+
+
+class AllowlistCache:
+    # Process-wide set of hashed emails shared by every session
+    def __init__(self, loader=load_allowed_users, ttl=ALLOWLIST_TTL, max_age=ALLOWLIST_MAX_AGE):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_age = max_age
+        self._hashes = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # one blocking sheet read at a time
+
+    def _load(self, generation):
+        hashes = frozenset(hash_email(email) for email in self.loader())
+        with self._lock:
+            # Drop results that raced with an invalidate()
+            if generation == self._generation:
+                self._hashes = hashes
+                self._loaded_at = time.monotonic()
+        return hashes
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            generation = self._generation
+
+        def run():
+            try:
+                self._load(generation)
+            except Exception:
+                pass  # keep serving the previous allowlist until the next attempt
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def contains(self, email):
+        hashes = self._hashes
+        age = time.monotonic() - self._loaded_at
+        if hashes is None or age > self.max_age:
+            with self._load_lock:
+                # Logins that waited on another caller's read reuse its result
+                hashes = self._hashes
+                if hashes is None or time.monotonic() - self._loaded_at > self.max_age:
+                    with span("allowlist.load"):
+                        hashes = self._load(self._generation)
+        elif age > self.ttl:
+            self._refresh_in_background()
+        return hash_email(email) in hashes
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._hashes = None
+
+
+_allowlist = AllowlistCache()
+
+def invalidate_allowlist():
+    # Call after revoking a user so the next login re-reads the sheet
+    _allowlist.invalidate()
+
 def login_user(email):
-    allowed_emails = load_allowed_users()
-    return email in allowed_emails
+    return _allowlist.contains(email)
@@ -0,0 +1,288 @@
+# Where the Leads rows come from. Pages declare the columns and filters they
+# need; backends that support it push both down to the source.
+#   LEADS_BACKEND=gsheets            (default; Leads worksheet via the local snapshot)
+#   LEADS_BACKEND=parquet:leads.parquet
+#   LEADS_BACKEND=csv:leads.csv
+#   LEADS_BACKEND=sqlite:leads.db    (table from LEADS_TABLE, default "leads")
+#   LEADS_BACKEND=duckdb:leads.duckdb
+import operator
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from schema import normalize_leads, source_columns
+from snapshot import LeadsSnapshot, load_leads
+
+DEFAULT_BACKEND = os.environ.get("LEADS_BACKEND", "gsheets")
+DEFAULT_TABLE = os.environ.get("LEADS_TABLE", "leads")
+
+# Filters are (column, op, value) tuples, the same form pyarrow accepts
+COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+FILTER_OPS = tuple(COMPARISONS) + ("in", "not in")
+
+_sync_lock = threading.Lock()  # one sheet download at a time (reruns and the login warm-up)
+
+
+def apply_filters(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, value in filters or ():
+        if op == "in":
+            hit = df[col].isin(list(value))
+        elif op == "not in":
+            hit = ~df[col].isin(list(value))
+        else:
+            hit = COMPARISONS[op](df[col], value)
+        mask &= hit.fillna(False).to_numpy(dtype=bool)
+    return df if mask.all() else df[mask].reset_index(drop=True)
+
+
+def _present(wanted, available):
+    return None if wanted is None else [col for col in wanted if col in available]
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class ParquetBackend:
+    def __init__(self, path):
+        self.path = path
+        self.name = f"parquet:{path}"
+
+    def refresh(self, force=False):
+        pass
+
+    def version(self):
+        return _file_version(self.path)
+
+    def status(self):
+        return f"{self.name} · v{self.version()}"
+
+    def columns(self):
+        import pyarrow.parquet as pq
+        return pq.read_schema(self.path).names
+
+    def read(self, columns=None, filters=None):
+        import pyarrow as pa
+
+        available = self.columns()
+        columns = _present(columns, available)
+        filters = [f for f in filters or () if f[0] in available]
+        try:
+            return pd.read_parquet(self.path, columns=columns, filters=filters or None)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            # Stored type doesn't match the filter value (e.g. dates kept as
+            # text); read_frame applies the filters after normalizing instead
+            return pd.read_parquet(self.path, columns=columns)
+
+
+class GSheetsBackend(ParquetBackend):
+    # The sheet itself can't filter or project, so reads go to the local
+    # Parquet snapshot, which is re-synced once per freshness window
+    def __init__(self, conn, worksheet="Leads", snapshot=None):
+        self.conn = conn
+        self.worksheet = worksheet
+        self.snapshot = snapshot or LeadsSnapshot()
+        super().__init__(self.snapshot.path)
+        self.name = f"gsheets:{worksheet}"
+
+    def refresh(self, force=False):
+        # Freshness is re-checked under the lock, so a caller that waited on a
+        # concurrent sync does not download the sheet again
+        with _sync_lock:
+            if force or not self.snapshot.is_fresh():
+                load_leads(self.conn, self.worksheet, snapshot=self.snapshot, force=True)
+
+    def version(self):
+        return self.snapshot.version()
+
+    def status(self):
+        return f"Data synced {int(self.snapshot.age() // 60)} min ago · v{self.version()}"
+
+
+class CSVBackend:
+    # Column pushdown only; predicates are applied after loading
+    def __init__(self, path):
+        self.path = path
+        self.name = f"csv:{path}"
+
+    def refresh(self, force=False):
+        pass
+
+    def version(self):
+        return _file_version(self.path)
+
+    def status(self):
+        return f"{self.name} · v{self.version()}"
+
+    def read(self, columns=None, filters=None):
+        wanted = None if columns is None else set(columns)
+        return pd.read_csv(self.path, usecols=None if wanted is None else lambda col: col in wanted)
+
+
+class SQLBackend:
+    # SQLite (stdlib) or DuckDB (optional dependency) file holding a leads
+    # table; columns become the SELECT list and filters a parameterized WHERE.
+    # A filter is only pushed down when its column's declared type matches the
+    # value (sheet-built tables often keep booleans and dates as text);
+    # read_frame applies the rest after normalizing.
+    def __init__(self, path, table=DEFAULT_TABLE, engine="sqlite"):
+        self.path = path
+        self.table = table
+        self.engine = engine
+        self.name = f"{engine}:{path}#{table}"
+
+    def refresh(self, force=False):
+        pass
+
+    def version(self):
+        return _file_version(self.path)
+
+    def status(self):
+        return f"{self.name} · v{self.version()}"
+
+    def _connect(self):
+        if self.engine == "duckdb":
+            import duckdb
+            return duckdb.connect(self.path, read_only=True)
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=names)
+        finally:
+            conn.close()
+
+    def columns(self):
+        return list(self._query(f"SELECT * FROM {_quote(self.table)} LIMIT 0").columns)
+
+    def column_types(self):
+        # {column: declared type}, upper-cased; "" where SQLite has none
+        if self.engine == "duckdb":
+            rows = self._query("SELECT column_name, data_type FROM information_schema.columns "
+                               "WHERE table_name = ?", (self.table,))
+        else:
+            rows = self._query(f"PRAGMA table_info({_quote(self.table)})")[["name", "type"]]
+        return {name: str(kind or "").upper() for name, kind in rows.itertuples(index=False)}
+
+    def read(self, columns=None, filters=None):
+        types = self.column_types()
+        columns = _present(columns, types)
+        select = "*" if columns is None else ", ".join(map(_quote, columns))
+        where, params = [], []
+        for col, op, value in filters or ():
+            if col not in types:
+                continue
+            values = list(value) if op in ("in", "not in") else [value]
+            if not all(_type_matches(types[col], v) for v in values):
+                continue
+            if op in ("in", "not in"):
+                values = [_sql_value(v) for v in value]
+                if not values:
+                    where.append("1 = 0" if op == "in" else "1 = 1")
+                    continue
+                where.append(f"{_quote(col)} {op.upper()} ({', '.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                where.append(f"{_quote(col)} {'=' if op == '==' else op} ?")
+                params.append(_sql_value(value))
+        sql = f"SELECT {select} FROM {_quote(self.table)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if self.engine == "sqlite":
+            sql += " ORDER BY rowid"  # storage order, same for every projection
+        return self._query(sql, params)
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _type_family(declared):
+    # SQLite affinity rules, plus the DuckDB type names
+    if "BOOL" in declared:
+        return "bool"
+    if "INT" in declared:
+        return "int"
+    if any(word in declared for word in ("REAL", "FLOA", "DOUB", "NUMERIC", "DECIMAL")):
+        return "number"
+    if "DATE" in declared or "TIME" in declared:
+        return "date"
+    if any(word in declared for word in ("CHAR", "CLOB", "TEXT", "STRING")):
+        return "text"
+    return None  # undeclared: stored values could be anything
+
+
+def _type_matches(declared, value):
+    family = _type_family(declared)
+    if isinstance(value, pd.Timestamp):
+        return family == "date"
+    value = _sql_value(value)
+    if isinstance(value, bool):
+        return family in ("bool", "int")  # SQLite stores booleans as 0/1
+    if isinstance(value, (int, float)):
+        return family in ("int", "number")
+    if isinstance(value, str):
+        return family == "text"
+    return False
+
+
+def _sql_value(value):
+    if isinstance(value, pd.Timestamp):
+        # Date-only text compares correctly against both "YYYY-MM-DD" and
+        # "YYYY-MM-DD HH:MM:SS" values
+        return value.strftime("%Y-%m-%d") if value == value.normalize() else value.isoformat(sep=" ")
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def backend_for_path(path, table=DEFAULT_TABLE):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return CSVBackend(path)
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return SQLBackend(path, table, "sqlite")
+    if ext == ".duckdb":
+        return SQLBackend(path, table, "duckdb")
+    return ParquetBackend(path)
+
+
+def open_backend(spec=DEFAULT_BACKEND, conn=None):
+    kind, _, target = spec.partition(":")
+    if kind == "gsheets":
+        return GSheetsBackend(conn, worksheet=target or "Leads")
+    if kind == "parquet":
+        return ParquetBackend(target)
+    if kind == "csv":
+        return CSVBackend(target)
+    if kind in ("sqlite", "duckdb"):
+        path, _, table = target.partition("#")
+        return SQLBackend(path, table or DEFAULT_TABLE, kind)
+    return backend_for_path(spec)
+
+
+def read_frame(backend, columns=None, filters=None):
+    # Normalized rows for the requested columns (None = all). Filters are applied
+    # again after normalizing: pushed-down predicates only see stored values, and
+    # backends without pushdown return every row.
+    wanted = None
+    if columns is not None:
+        wanted = source_columns(["Lead ID", *columns, *(col for col, _, _ in filters or ())])
+    # Rows are kept exactly as stored (the Sheets snapshot already drops blank
+    # rows) so every unfiltered projection lines up row for row with the others
+    return apply_filters(normalize_leads(backend.read(wanted, filters), dropna=False), filters)
@@ -0,0 +1,66 @@
+# Times funnel.funnel_table against the old per-group lambda approach.
+#   python benchmarks/bench_funnel.py --rows 1000000 2000000 --groups 100 5000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from funnel import funnel_table  # noqa: E402
+
+
+def make_leads(rows, groups, seed=0):
+    rng = np.random.default_rng(seed)
+    converted = rng.random(rows) < 0.3
+    return pd.DataFrame({
+        "Lead ID": np.arange(rows),
+        "Group": pd.Categorical.from_codes(rng.integers(0, groups, rows), [f"G{i}" for i in range(groups)]),
+        "Stage": pd.Categorical.from_codes(rng.integers(0, 3, rows), ["Closed-Won", "Open", "Lost"]),
+        "Converted Count": converted.astype("int8"),
+        "Appointments Completed (Count)": (converted & (rng.random(rows) < 0.5)).astype("int8"),
+        "Number of Outbound Calls": rng.integers(0, 6, rows, dtype="int8"),
+        "Cost": rng.gamma(2.0, 30.0, rows),
+    }).assign(**{"Closed-Won": lambda d: d["Stage"] == "Closed-Won"})
+
+
+def legacy(df):
+    grouped = df.groupby("Group", observed=True).agg(
+        total_leads=("Lead ID", "count"),
+        closed_won=("Stage", lambda x: (x.str.lower() == "closed-won").sum()),
+    ).reset_index()
+    grouped["net_pull_through"] = round((grouped["closed_won"] / grouped["total_leads"]) * 100, 2)
+    return grouped
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--groups", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument("--legacy-max-groups", type=int, default=1_000,
+                        help="skip the lambda baseline above this many groups")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'groups':>8} {'funnel (s)':>11} {'legacy (s)':>11}")
+    for rows in args.rows:
+        for groups in args.groups:
+            df = make_leads(rows, groups)
+            fast = timed(funnel_table, df, ["Group"])
+            slow = timed(legacy, df, repeat=1) if groups <= args.legacy_max_groups else float("nan")
+            print(f"{rows:>10} {groups:>8} {fast:>11.3f} {slow:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Times and memory-profiles each page's computation on synthetic Leads data and
+# compares against a saved baseline; exits non-zero on a regression or when
+# there is no baseline to compare against.
+#   python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 --save-baseline
+#   python benchmarks/run_benchmarks.py --rows 10000 100000 1000000
+# Correctness of the indexes and sketches is covered by tests/ (python -m pytest -q).
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from allocation import allocation_grid, bootstrap_cpa, calculate_budget_allocations, fit_response_curves  # noqa: E402
+from anomalies import detect_anomalies  # noqa: E402
+from cards import card_grid_html  # noqa: E402
+from cohorts import build_cohorts  # noqa: E402
+from cost_forecasting import forecast_cost, forecast_segments  # noqa: E402
+from data_browser import page_slice  # noqa: E402
+from dedupe import DuplicateIndex  # noqa: E402
+from funnel import funnel_table  # noqa: E402
+from metrics_cube import build_cube, rollup  # noqa: E402
+from monthly_tables import monthly_table  # noqa: E402
+from reports import cost_map, kpi_summary, source_breakdown  # noqa: E402
+from schema import normalize_leads  # noqa: E402
+from sketches import build_sketch  # noqa: E402
+from synthetic import write_leads  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DATA_DIR = os.path.join(ROOT, ".cache", "bench")
+NOISE_FLOOR = 0.05  # seconds; smaller slowdowns are timer noise
+
+
+def dataset_path(rows, seed=0):
+    # Generated once per size, in chunks, and reused across runs
+    path = os.path.join(DATA_DIR, f"leads_{rows}_{seed}.parquet")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        write_leads(path + ".tmp", rows, seed=seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def cases(path, budget=100_000):
+    # name -> (setup, fn); setup results are built outside the timed region
+    raw = lambda: pd.read_parquet(path)  # noqa: E731
+    leads = lambda: normalize_leads(raw())  # noqa: E731
+    cube = lambda: build_cube(leads())  # noqa: E731
+    return {
+        "load_snapshot": (lambda: path, pd.read_parquet),
+        "normalize_leads": (raw, normalize_leads),
+        "build_cube": (leads, build_cube),
+        "page_performance_dashboard": (cube, lambda c: (kpi_summary(c), card_grid_html(source_breakdown(c)))),
+        "page_lead_quality": (cube, lambda c: (rollup(c, ["Lead Source"]), rollup(c, ["State"]))),
+        "page_conversion_analysis": (cube, lambda c: [funnel_table(c, by) for by in
+                                                      (["State"], ["Lead Source"], ["Lead Source", "Month-Year"],
+                                                       ["State", "Month-Year"])]),
+        "cohorts": (leads, lambda d: [build_cohorts(d).lag_quantiles(dim) for dim in ("Lead Source", "State")]),
+        "monthly_tables_export": (cube, lambda c: [monthly_table(c, by).export(fmt) for by in ("Lead Source", "State")
+                                                   for fmt in ("csv", "parquet")]),
+        "page_cost_analysis": (cube, cost_map),
+        "detect_anomalies": (cube, detect_anomalies),
+        "page_lead_overview": (leads, lambda d: page_slice(d, search="john", sort_by="Cost", page=2)),
+        "duplicate_detection": (leads, lambda d: DuplicateIndex().add(d).groups()),
+        "sketch_leads": (leads, lambda d: build_sketch(d, max_workers=1)),
+        "page_lead_quality_approx": (lambda: build_sketch(leads(), max_workers=1),
+                                     lambda s: (s.duplicates(), s.top("Lead Source"), s.top("State"))),
+        "calculate_budget_allocations": (leads, lambda d: calculate_budget_allocations(d, budget)),
+        "optimized_allocation": (cube, lambda c: allocation_grid(fit_response_curves(c), 1_000_000, 1000)),
+        "bootstrap_cpa": (leads, lambda d: bootstrap_cpa(d, n_boot=1000, max_workers=1)),
+        "forecast_cost": (leads, lambda d: forecast_cost(d, 3)),
+        "forecast_segments": (leads, lambda d: forecast_segments(d, periods=3)),
+    }
+
+
+def measure(setup, fn, repeat):
+    data = setup()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    # Separate traced run; tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    try:
+        fn(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mb": round(peak / 2**20, 2)}
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    failures = []
+    for rows, timings in results.items():
+        for name, current in timings.items():
+            base = baseline.get(rows, {}).get(name)
+            if base is None:
+                continue
+            slower = current["seconds"] - base["seconds"]
+            if slower > NOISE_FLOOR and current["seconds"] > base["seconds"] * (1 + time_tolerance):
+                failures.append(f"{name} @ {rows} rows: {base['seconds']:.3f}s -> {current['seconds']:.3f}s")
+            if current["peak_mb"] > max(base["peak_mb"] * (1 + memory_tolerance), base["peak_mb"] + 1):
+                failures.append(f"{name} @ {rows} rows: {base['peak_mb']:.1f} MB -> {current['peak_mb']:.1f} MB")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard computations on synthetic leads.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("--skip", nargs="+", default=[], help="Skip these benchmarks (e.g. duplicate_detection at 10M)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the new baseline")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="Only print timings when there is no baseline (exploratory runs)")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'benchmark':<30} {'rows':>10} {'seconds':>9} {'peak MB':>9}")
+    for rows in args.rows:
+        path = dataset_path(rows)
+        timings = results[str(rows)] = {}
+        for name, (setup, fn) in cases(path).items():
+            if (args.only and name not in args.only) or name in args.skip:
+                continue
+            timings[name] = measure(setup, fn, args.repeat)
+            print(f"{name:<30} {rows:>10} {timings[name]['seconds']:>9.3f} {timings[name]['peak_mb']:>9.1f}")
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)
+        for rows, timings in results.items():
+            saved.setdefault(rows, {}).update(timings)
+        saved["machine"] = {"python": platform.python_version(), "pandas": pd.__version__,
+                            "platform": platform.platform(), "cpus": os.cpu_count()}
+        with open(args.baseline, "w") as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one", file=sys.stderr)
+        return 0 if args.allow_missing_baseline else 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failures = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    if failures:
+        print(f"{len(failures)} benchmark(s) regressed against {args.baseline}", file=sys.stderr)
+        return 1
+    print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import hashlib
+import html
+
+import numpy as np
+import pandas as pd
+
+CARD_CSS = """
+<style>
+.card-grid {
+    display: grid;
+    grid-template-columns: repeat(2, minmax(0, 1fr));
+    column-gap: 1rem;
+}
+
+.custom-card {
+    border-radius: 10px;
+    padding: 1.2rem;
+    background-color: #ffffff;
+    box-shadow: 0 2px 6px rgba(0, 0, 0, 0.08);
+    border-left: 5px solid #82f7b0;
+    margin-bottom: 1rem;
+}
+
+.custom-title {
+    font-size: 1.2rem;
+    font-weight: 700;
+    margin-bottom: 0.6rem;
+    color: #222;
+}
+
+.custom-metrics {
+    font-size: 1rem;
+    color: #333;
+    line-height: 1.6;
+    font-weight: 500;
+}
+
+.custom-metrics span {
+    display: inline-block;
+    margin-right: 1.5rem;
+}
+</style>
+"""
+
+
+def source_card_frame(grouped):
+    # grouped: roll-up of the metrics cube by Lead Source
+    cards = grouped[["Lead Source", "leads", "conversions", "outbound_calls", "cost"]].copy()
+    cards["CPL"] = (cards["cost"] / cards["leads"].replace(0, np.nan)).round(2).fillna(0)
+    cards["CPA"] = (cards["cost"] / cards["conversions"].replace(0, np.nan)).round(2).fillna(0)
+    return cards.reset_index(drop=True)
+
+
+def fingerprint(frame):
+    return hashlib.sha256(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def _money(values):
+    return "$" + values.map("{:.2f}".format)
+
+
+def card_grid_html(cards):
+    # Whole grid as one fragment, built with column-wise string ops
+    def count(col):
+        return cards[col].astype("int64").astype(str)
+
+    titles = cards["Lead Source"].astype(str).map(html.escape)
+    blocks = (
+        '<div class="custom-card"><div class="custom-title">' + titles + "</div>"
+        + '<div class="custom-metrics">'
+        + "<span>Leads: <strong>" + count("leads") + "</strong></span>"
+        + "<span>Converted: <strong>" + count("conversions") + "</strong></span>"
+        + "<span>Calls: <strong>" + count("outbound_calls") + "</strong></span>"
+        + '</div><div class="custom-metrics">'
+        + "<span>Cost: <strong>" + _money(cards["cost"]) + "</strong></span>"
+        + "<span>CPA: <strong>" + _money(cards["CPA"]) + "</strong></span>"
+        + "<span>CPL: <strong>" + _money(cards["CPL"]) + "</strong></span>"
+        + "</div></div>"
+    )
+    return CARD_CSS + '<div class="card-grid">' + "".join(blocks) + "</div>"
@@ -0,0 +1,190 @@
+# Time-to-convert cohorts: leads binned by Created Date month (the cohort) and by
+# conversion lag, in LAG_DAYS-wide bins from Created Date to Approval Date. One
+# bincount per dimension fills a segments x cohorts x lags int32 array; a sync
+# recomputes only the cohort months whose rows changed, so a new month of data
+# costs one month of work.
+import threading
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ["Lead Source", "State"]
+LAG_DAYS = 7    # lag bin width
+MAX_LAGS = 26   # bins of LAG_DAYS; the last one also holds anything later
+COHORT_COLUMNS = ["Lead ID", *DIMENSIONS, "Created Date", "Approval Date", "Converted Count"]
+QUANTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def _months(dates):
+    # Absolute month number (year * 12 + month - 1), -1 where the date is missing
+    values = dates.to_numpy(dtype="datetime64[M]")
+    months = values.astype(np.int64) + 1970 * 12
+    return np.where(np.isnat(values), -1, months)
+
+
+def _lag_bins(df, lag_days, max_lags):
+    # Lag bin per row, -1 for leads that have not converted (or have bad dates)
+    days = (df["Approval Date"] - df["Created Date"]).dt.days.to_numpy(dtype=float, na_value=np.nan)
+    converted = (df["Converted Count"] == 1).to_numpy() & (days >= 0)
+    bins = np.minimum(np.floor_divide(np.nan_to_num(days, nan=0), lag_days), max_lags - 1).astype(np.int64)
+    return np.where(converted, bins, -1)
+
+
+def _month_label(month):
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+class CohortCube:
+    def __init__(self, lag_days=LAG_DAYS, max_lags=MAX_LAGS, dimensions=DIMENSIONS):
+        self.lag_days, self.max_lags = lag_days, max_lags
+        self.dimensions = list(dimensions)
+        self._lock = threading.Lock()
+        self.first_month = None  # absolute month of cohort 0
+        self.fingerprints = np.zeros(0, dtype=np.uint64)
+        self.segments = {dim: [] for dim in self.dimensions}
+        self.leads = {dim: np.zeros((0, 0), dtype=np.int32) for dim in self.dimensions}
+        self.converted = {dim: np.zeros((0, 0, max_lags), dtype=np.int32) for dim in self.dimensions}
+        self.updated = 0  # cohort months recomputed by the last sync
+
+    @property
+    def months(self):
+        return len(self.fingerprints)
+
+    def cohort_labels(self):
+        return [_month_label(self.first_month + i) for i in range(self.months)]
+
+    def _resize(self, first, last):
+        # Grow the cohort axis to cover absolute months first..last
+        if self.first_month is None:
+            self.first_month = first
+        before = max(self.first_month - first, 0)
+        after = max(last - (self.first_month + self.months - 1), 0)
+        if before or after:
+            self.first_month -= before
+            self.fingerprints = np.pad(self.fingerprints, (before, after))
+            for dim in self.dimensions:
+                self.leads[dim] = np.pad(self.leads[dim], ((0, 0), (before, after)))
+                self.converted[dim] = np.pad(self.converted[dim], ((0, 0), (before, after), (0, 0)))
+
+    def _segment_codes(self, dim, values):
+        # Codes into self.segments[dim], adding labels seen for the first time
+        codes, labels = pd.factorize(values.astype("string"))
+        known = {label: i for i, label in enumerate(self.segments[dim])}
+        new = [label for label in labels if label not in known]
+        if new:
+            for label in new:
+                known[label] = len(self.segments[dim])
+                self.segments[dim].append(label)
+            grow = len(new)
+            self.leads[dim] = np.pad(self.leads[dim], ((0, grow), (0, 0)))
+            self.converted[dim] = np.pad(self.converted[dim], ((0, grow), (0, 0), (0, 0)))
+        mapping = np.array([known[label] for label in labels] + [-1], dtype=np.int64)
+        return mapping[codes]  # code -1 (missing) maps to the trailing -1
+
+    def sync(self, df):
+        # Per-month fingerprints over the cohort columns pick the months to redo
+        with self._lock:
+            months = _months(df["Created Date"])
+            valid = months >= 0
+            if not valid.any():
+                return self
+            self._resize(int(months[valid].min()), int(months[valid].max()))
+            cohort = np.where(valid, months - self.first_month, -1)
+
+            row_hash = pd.util.hash_pandas_object(df[[c for c in COHORT_COLUMNS if c in df.columns]],
+                                                  index=False).to_numpy()
+            fingerprints = np.zeros(self.months, dtype=np.uint64)
+            np.add.at(fingerprints, cohort[valid], row_hash[valid])  # wraps mod 2**64
+            changed = fingerprints != self.fingerprints
+            self.updated = int(changed.sum())
+            if not self.updated:
+                return self
+
+            rows = valid & changed[np.maximum(cohort, 0)]
+            lags = _lag_bins(df[rows], self.lag_days, self.max_lags)
+            cohort_rows = cohort[rows]
+            for dim in self.dimensions:
+                segment = self._segment_codes(dim, df.loc[rows, dim])
+                keep = segment >= 0
+                n_seg = len(self.segments[dim])
+                cells = segment[keep] * self.months + cohort_rows[keep]
+                self.leads[dim][:, changed] = 0
+                self.leads[dim] += np.bincount(cells, minlength=n_seg * self.months) \
+                    .reshape(n_seg, self.months).astype(np.int32)
+                hit = lags[keep] >= 0
+                cells = cells[hit] * self.max_lags + lags[keep][hit]
+                self.converted[dim][:, changed, :] = 0
+                self.converted[dim] += np.bincount(cells, minlength=n_seg * self.months * self.max_lags) \
+                    .reshape(n_seg, self.months, self.max_lags).astype(np.int32)
+            self.fingerprints = fingerprints
+            return self
+
+    def copy(self):
+        # Detached arrays for readers, so a later sync never changes them mid-render
+        with self._lock:
+            other = CohortCube(self.lag_days, self.max_lags, self.dimensions)
+            other.first_month, other.updated = self.first_month, self.updated
+            other.fingerprints = self.fingerprints.copy()
+            other.segments = {dim: list(labels) for dim, labels in self.segments.items()}
+            other.leads = {dim: arr.copy() for dim, arr in self.leads.items()}
+            other.converted = {dim: arr.copy() for dim, arr in self.converted.items()}
+            return other
+
+    def _select(self, dim, segment=None):
+        # (leads per cohort, conversions per cohort x lag) for one segment or all
+        if segment is None:
+            return self.leads[dim].sum(axis=0), self.converted[dim].sum(axis=0)
+        i = self.segments[dim].index(segment)
+        return self.leads[dim][i], self.converted[dim][i]
+
+    def lag_labels(self):
+        labels = [f"{i * self.lag_days}-{(i + 1) * self.lag_days - 1}d" for i in range(self.max_lags)]
+        labels[-1] = f"{(self.max_lags - 1) * self.lag_days}d+"
+        return labels
+
+    def matrix(self, dim, segment=None):
+        # Cohort x lag conversion counts; empty cohorts dropped
+        leads, converted = self._select(dim, segment)
+        keep = leads > 0
+        frame = pd.DataFrame(converted[keep], columns=self.lag_labels(),
+                             index=pd.Index(np.array(self.cohort_labels(), dtype=object)[keep], name="Cohort"))
+        frame.insert(0, "Leads", leads[keep])
+        return frame
+
+    def conversion_curve(self, dim, segment=None):
+        # Long form: cumulative % of each cohort converted by the end of each lag bin
+        leads, converted = self._select(dim, segment)
+        keep = leads > 0
+        rates = np.cumsum(converted[keep], axis=1) * 100.0 / leads[keep, None]
+        cohorts = np.array(self.cohort_labels(), dtype=object)[keep]
+        return pd.DataFrame({
+            "Cohort": np.repeat(cohorts, self.max_lags),
+            "Lag": np.tile(self.lag_labels(), len(cohorts)),
+            "Converted (%)": rates.ravel().round(2),
+        })
+
+    def lag_quantiles(self, dim, quantiles=QUANTILES):
+        # Days to convert per segment, interpolated inside the lag bins; values
+        # in the open last bin are reported as its lower edge
+        counts = self.converted[dim].sum(axis=1)  # segments x lags
+        counts = np.vstack([counts, counts.sum(axis=0)])
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1]
+        edges = np.arange(self.max_lags + 1) * self.lag_days
+        out = {}
+        for q in quantiles:
+            target = q * totals
+            bins = np.minimum((cumulative < target[:, None]).sum(axis=1), self.max_lags - 1)
+            before = np.take_along_axis(cumulative, bins[:, None], 1)[:, 0] - \
+                np.take_along_axis(counts, bins[:, None], 1)[:, 0]
+            inside = np.take_along_axis(counts, bins[:, None], 1)[:, 0]
+            share = np.divide(target - before, inside, out=np.zeros(len(bins)), where=inside > 0)
+            share = np.where(bins == self.max_lags - 1, 0, share)
+            days = edges[bins] + share * self.lag_days
+            out[f"p{round(q * 100)} days"] = np.where(totals > 0, days.round(1), np.nan)
+        frame = pd.DataFrame({dim: self.segments[dim] + ["All"], "Converted": totals, **out})
+        return frame[frame["Converted"] > 0].reset_index(drop=True)
+
+
+def build_cohorts(df, lag_days=LAG_DAYS, max_lags=MAX_LAGS):
+    return CohortCube(lag_days, max_lags).sync(df)
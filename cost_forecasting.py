@@ -1,30 +1,142 @@
-from prophet import Prophet
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-def forecast_cost(df, periods=3):
-    df["Cost"] = pd.to_numeric(df["Cost"], errors="coerce")
-    df = df.dropna(subset=["Cost"])
+from smoothing import forecast_batch
+from tracing import span, traced
+
+MODEL_CACHE_DIR = os.path.join(os.environ.get("LEADS_SNAPSHOT_DIR", ".cache"), "prophet")
+SEGMENT_DIMENSIONS = ("Lead Source", "State")
+ENGINES = ("smoothing", "prophet")
+FORECAST_COLUMNS = ["Dimension", "Segment", "ds", "yhat", "yhat_lower", "yhat_upper"]
+INPUT_COLUMNS = ["Cost", "Month", "Year", *SEGMENT_DIMENSIONS]
+
+_models = {}  # fingerprint -> fitted model, per process
+
+@traced()
+def monthly_cost(df, by=()):
+    by = list(by)
+    cost = pd.to_numeric(df["Cost"], errors="coerce")
 
     # Combine Year and Month to create Date
-    df["Month"] = df["Month"].astype(str).str.zfill(2)
-    df["Date"] = pd.to_datetime(df["Year"].astype(str) + "-" + df["Month"])
+    month = df["Month"].astype(str).str.zfill(2)
+    date = pd.to_datetime(df["Year"].astype(str) + "-" + month, errors="coerce")
+
+    frame = pd.DataFrame({**{k: df[k] for k in by}, "ds": date, "y": cost}).dropna(subset=["ds", "y"])
 
     # Aggregate total cost per month
-    monthly_cost = df.groupby("Date")["Cost"].sum().reset_index()
-    monthly_cost.rename(columns={"Date": "ds", "Cost": "y"}, inplace=True)
+    return frame.groupby(by + ["ds"], observed=True)["y"].sum().reset_index()
+
+def series_fingerprint(series, periods):
+    digest = hashlib.sha256()
+    digest.update(series["ds"].to_numpy(dtype="datetime64[ns]").tobytes())
+    digest.update(series["y"].to_numpy(dtype="float64").tobytes())
+    digest.update(str(periods).encode())
+    return digest.hexdigest()[:32]
+
+def fit_model(series, periods):
+    # Prophet (and its Stan backend) is only imported when this engine is used
+    from prophet import Prophet
+    from prophet.serialize import model_from_json, model_to_json
+
+    # Unchanged monthly series never trigger a refit: memory first, then disk
+    key = series_fingerprint(series, periods)
+    if key in _models:
+        return _models[key]
 
-    # Fit the model
-    model = Prophet()
-    model.fit(monthly_cost)
+    path = os.path.join(MODEL_CACHE_DIR, f"{key}.json")
+    if os.path.exists(path):
+        with span("prophet.load", key=key), open(path) as f:
+            model = model_from_json(f.read())
+    else:
+        with span("prophet.fit", key=key):
+            model = Prophet()
+            model.fit(series)
+        os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(model_to_json(model))
+        os.replace(tmp, path)
 
-    # Make future dataframe and forecast
-    future = model.make_future_dataframe(periods=periods, freq='M')
-    forecast = model.predict(future)
+    _models[key] = model
+    return model
+
+def prophet_forecast(series, periods=3):
+    model = fit_model(series, periods)
+
+    # Make future dataframe and forecast (series dates are month starts)
+    future = model.make_future_dataframe(periods=periods, freq="MS")
+    with span("prophet.predict"):
+        forecast = model.predict(future)
 
     # Filter only forecasted months (not in original)
-    
-    forecast_future = forecast[forecast["ds"] > monthly_cost["ds"].max()]
-    forecast_output = forecast_future[["ds", "yhat", "yhat_lower", "yhat_upper"]].to_dict(orient="records")
+    forecast_future = forecast[forecast["ds"] > series["ds"].max()]
+    return forecast_future[["ds", "yhat", "yhat_lower", "yhat_upper"]].to_dict(orient="records")
+
+@traced()
+def smoothing_forecast(monthly, periods=3, by=()):
+    # Every series laid out on one monthly calendar and fitted in a single batch;
+    # months without leads count as zero cost
+    by = list(by)
+    if monthly.empty:
+        return pd.DataFrame(columns=["Segment", "ds", "yhat", "yhat_lower", "yhat_upper"])
+    months = pd.date_range(monthly["ds"].min(), monthly["ds"].max(), freq="MS")
+    if by:
+        matrix = monthly.pivot_table(index=by, columns="ds", values="y", aggfunc="sum", observed=True)
+    else:
+        matrix = monthly.set_index("ds")[["y"]].T
+    matrix = matrix.reindex(columns=months, fill_value=0.0)
+
+    yhat, lower, upper = forecast_batch(matrix.to_numpy(), periods)
+    future = pd.date_range(months[-1], periods=periods + 1, freq="MS")[1:]
+    segments = matrix.index if by else ["All"]
+    return pd.DataFrame({
+        "Segment": np.repeat(np.asarray(segments, dtype=object), periods),
+        "ds": np.tile(future, len(segments)),
+        "yhat": yhat.ravel(),
+        "yhat_lower": lower.ravel(),
+        "yhat_upper": upper.ravel(),
+    })
+
+@traced()
+def forecast_cost(df, periods=3, engine="smoothing"):
+    monthly = monthly_cost(df)
+    if monthly.empty:
+        return []
+    if engine == "prophet":
+        return prophet_forecast(monthly, periods)
+    return smoothing_forecast(monthly, periods).drop(columns="Segment").to_dict(orient="records")
+
+def _forecast_segment(job):
+    dimension, segment, series, periods = job
+    return [{"Dimension": dimension, "Segment": segment, **row} for row in prophet_forecast(series, periods)]
+
+def forecast_segments(df, dimensions=SEGMENT_DIMENSIONS, periods=3, engine="smoothing",
+                      max_workers=None, min_points=2):
+    if engine != "prophet":
+        frames = []
+        for dimension in dimensions:
+            monthly = monthly_cost(df, by=[dimension])
+            if not monthly.empty:
+                frames.append(smoothing_forecast(monthly, periods, by=[dimension]).assign(Dimension=dimension))
+        if not frames:
+            return pd.DataFrame(columns=FORECAST_COLUMNS)
+        return pd.concat(frames, ignore_index=True)[FORECAST_COLUMNS]
+
+    # One Prophet fit per Lead Source / State series, spread over a process pool
+    jobs = []
+    for dimension in dimensions:
+        monthly = monthly_cost(df, by=[dimension])
+        for segment, series in monthly.groupby(dimension, observed=True):
+            if len(series) >= min_points:
+                jobs.append((dimension, segment, series[["ds", "y"]].reset_index(drop=True), periods))
 
-    return forecast_output
+    if not jobs:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
 
+    with span("prophet.segments", jobs=len(jobs)), ProcessPoolExecutor(max_workers=max_workers) as pool:
+        rows = [row for result in pool.map(_forecast_segment, jobs) for row in result]
+    return pd.DataFrame(rows)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+def search_mask(df, text, columns=None):
+    # Case-insensitive substring match over text-like columns; categoricals are
+    # matched on their categories, not row by row
+    text = (text or "").strip().lower()
+    if not text:
+        return np.ones(len(df), dtype=bool)
+    mask = np.zeros(len(df), dtype=bool)
+    for col in columns if columns is not None else df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            hits = series.cat.categories.astype(str).str.lower().str.contains(text, regex=False)
+            mask |= np.isin(series.cat.codes.to_numpy(), np.flatnonzero(hits))
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            mask |= series.astype("string").str.lower().str.contains(text, regex=False).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+def filter_mask(df, filters):
+    # filters: {column: allowed value or list of values}
+    mask = np.ones(len(df), dtype=bool)
+    for col, allowed in (filters or {}).items():
+        if allowed is None or (isinstance(allowed, (list, tuple, set)) and not allowed):
+            continue
+        values = list(allowed) if isinstance(allowed, (list, tuple, set)) else [allowed]
+        mask &= df[col].isin(values).to_numpy()
+    return mask
+
+
+def page_count(total_rows, page_size):
+    return max(1, -(-total_rows // page_size))
+
+
+def match_positions(df, search=None, filters=None, sort_by=None, ascending=True):
+    # Row positions that pass the search/filters, in display order
+    positions = np.flatnonzero(search_mask(df, search) & filter_mask(df, filters))
+    if sort_by is not None and len(positions):
+        keys = df[sort_by].iloc[positions].reset_index(drop=True)
+        try:
+            order = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        except TypeError:  # mixed types in a raw sheet column
+            order = keys.astype(str).sort_values(ascending=ascending, kind="stable").index
+        positions = positions[order.to_numpy()]
+    return positions
+
+
+def take_page(df, positions, page=1, page_size=50, columns=None):
+    # Only the requested page (and projected columns) is copied
+    page = min(max(int(page), 1), page_count(len(positions), page_size))
+    rows = positions[(page - 1) * page_size:page * page_size]
+    if columns:
+        return df.iloc[rows, [df.columns.get_loc(c) for c in columns]]
+    return df.iloc[rows]
+
+
+def page_slice(df, columns=None, search=None, filters=None, sort_by=None, ascending=True,
+               page=1, page_size=50):
+    # Returns (page frame, number of matching rows)
+    positions = match_positions(df, search, filters, sort_by, ascending)
+    return take_page(df, positions, page, page_size, columns), len(positions)
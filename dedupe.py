@@ -0,0 +1,181 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["Lead ID", "First Name", "Zip Code", "State"]  # what a row's matches depend on
+MATCH_THRESHOLD = 0.88     # Jaro-Winkler similarity that counts as the same first name
+PHONETIC_THRESHOLD = 0.84  # lower bar when the Soundex codes also agree (Mary/Marie)
+
+_SOUNDEX = {c: d for d, letters in {
+    "1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r",
+}.items() for c in letters}
+
+
+def soundex(name):
+    if not name:
+        return ""
+    code, last = name[0].upper(), _SOUNDEX.get(name[0], "")
+    for c in name[1:]:
+        digit = _SOUNDEX.get(c, "")
+        if digit and digit != last:
+            code += digit
+        if c not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+
+def jaro_winkler(a, b):
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    a_hit, b_hit = [False] * len(a), [False] * len(b)
+    matches = 0
+    for i, c in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_hit[j] and b[j] == c:
+                a_hit[i] = b_hit[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+    a_seq = [c for c, hit in zip(a, a_hit) if hit]
+    b_seq = [c for c, hit in zip(b, b_hit) if hit]
+    transpositions = sum(x != y for x, y in zip(a_seq, b_seq)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def normalize_keys(df):
+    # Blocking keys: State + 5-digit Zip + first initial; names lowercased letters only
+    name = df["First Name"].astype("string").str.lower().str.replace(r"[^a-z]", "", regex=True).fillna("")
+    zip_code = (df["Zip Code"].astype("string").str.strip().str.replace(r"\.0$", "", regex=True)
+                .str.replace(r"\D", "", regex=True).str.zfill(5).str[:5].fillna(""))
+    state = df["State"].astype("string").str.strip().str.upper().fillna("")
+    keys = pd.DataFrame({"name": name.to_numpy(dtype=object), "zip": zip_code.to_numpy(dtype=object),
+                         "state": state.to_numpy(dtype=object)})
+    keys["block"] = keys["state"] + "|" + keys["zip"] + "|" + keys["name"].str[:1]
+    keys["valid"] = (keys["name"] != "") & (keys["zip"].str.strip("0") != "")
+    return keys
+
+
+def _row_hashes(df):
+    # One hash per row over the key columns, so edited names/zips/states are seen
+    columns = [col for col in KEY_COLUMNS if col in df.columns]
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def _connected_labels(n, left, right):
+    # Vectorized union-find: min-label propagation with pointer jumping
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        before = labels.copy()
+        np.minimum.at(labels, left, low)
+        np.minimum.at(labels, right, low)
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+
+class DuplicateIndex:
+    # Blocked fuzzy/phonetic duplicate index over lead rows, extendable with new rows
+    def __init__(self, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.keys = pd.DataFrame(columns=["block", "name_id", "valid", "row"])
+        self.row_hashes = np.array([], dtype=np.uint64)
+        self.left = np.array([], dtype=np.int64)
+        self.right = np.array([], dtype=np.int64)
+        self.labels = np.array([], dtype=np.int64)
+        self._name_ids = {}
+        self._names = []
+        self._codes = np.array([], dtype=object)
+        self._similarity = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _encode_names(self, names):
+        for name in pd.unique(names):
+            if name not in self._name_ids:
+                self._name_ids[name] = len(self._names)
+                self._names.append(name)
+        self._codes = np.array([soundex(n) for n in self._names], dtype=object) \
+            if len(self._codes) != len(self._names) else self._codes
+        return names.map(self._name_ids).to_numpy(dtype=np.int64)
+
+    def _names_match(self, a, b):
+        # Vectorized over name ids; Jaro-Winkler only runs once per distinct
+        # name pair ever seen
+        same = a == b
+        pending = ~same
+        if pending.any():
+            pair_keys, inverse = np.unique(a[pending] * len(self._names) + b[pending], return_inverse=True)
+            scores = np.empty(len(pair_keys))
+            for i, key in enumerate(pair_keys.tolist()):
+                pair = divmod(key, len(self._names))
+                pair_name = (self._names[pair[0]], self._names[pair[1]])
+                if pair_name not in self._similarity:
+                    self._similarity[pair_name] = jaro_winkler(*pair_name)
+                scores[i] = self._similarity[pair_name]
+            scores = scores[inverse]
+            phonetic = self._codes[a[pending]] == self._codes[b[pending]]
+            same[pending] = (scores >= self.threshold) | (phonetic & (scores >= PHONETIC_THRESHOLD))
+        return same
+
+    def add(self, df):
+        start = len(self.keys)
+        normalized = normalize_keys(df)
+        keys = pd.DataFrame({
+            "block": normalized["block"],
+            "name_id": self._encode_names(normalized["name"]),
+            "valid": normalized["valid"],
+            "row": np.arange(start, start + len(normalized)),
+        })
+        self.keys = keys if start == 0 else pd.concat([self.keys, keys], ignore_index=True)
+        self.row_hashes = np.concatenate([self.row_hashes, _row_hashes(df)])
+
+        # Candidate pairs: each new row against earlier rows of the same block
+        new = keys[keys["valid"]]
+        pool = self.keys[self.keys["valid"] & self.keys["block"].isin(new["block"])]
+        pairs = new[["block", "row", "name_id"]].merge(pool[["block", "row", "name_id"]], on="block", suffixes=("", "_other"))
+        pairs = pairs[pairs["row_other"] < pairs["row"]]
+
+        if len(pairs):
+            match = self._names_match(pairs["name_id"].to_numpy(), pairs["name_id_other"].to_numpy())
+            self.left = np.concatenate([self.left, pairs["row"].to_numpy()[match]])
+            self.right = np.concatenate([self.right, pairs["row_other"].to_numpy()[match]])
+        self.labels = _connected_labels(len(self.keys), self.left, self.right)
+        return self
+
+    def sync(self, df):
+        # Appended rows are indexed incrementally; an edit to any indexed row's
+        # keys (not just its Lead ID) rebuilds
+        with self._lock:
+            hashes = _row_hashes(df)
+            if len(hashes) >= len(self) and np.array_equal(hashes[:len(self)], self.row_hashes):
+                return self.add(df.iloc[len(self):]) if len(hashes) > len(self) else self
+            self._reset()
+            return self.add(df)
+
+    def duplicate_mask(self):
+        sizes = np.bincount(self.labels, minlength=len(self.labels))
+        return sizes[self.labels] > 1
+
+    def groups(self):
+        # Duplicate Group id per row (NaN for unique rows), numbered 1..n
+        mask = self.duplicate_mask()
+        group = np.full(len(self.labels), np.nan)
+        group[mask] = pd.factorize(self.labels[mask])[0] + 1
+        return pd.Series(group)
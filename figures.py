@@ -0,0 +1,112 @@
+# Chart builders for the dashboard pages, each taking a small aggregate frame.
+# Figures are slimmed before they are sent: additive categories past TOP_N go
+# into one "Other" slice, numeric arrays are rounded and downcast (Plotly ships
+# numpy arrays as base64 typed arrays), and line charts use WebGL. Pie, bar and
+# choropleth traces have no WebGL variant in Plotly, so they stay SVG.
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+TOP_N = 12
+OTHER = "Other"
+DECIMALS = 2
+NUMERIC_ATTRS = ("x", "y", "z", "values")
+HOVER_REFS = {"x": "%{x}", "y": "%{y}", "z": "%{z}", "values": "%{value}"}
+
+
+def top_n(frame, label, value, n=TOP_N, other=OTHER):
+    # Largest n - 1 rows kept as they are; everything else summed into `other`
+    frame = frame.sort_values(value, ascending=False)
+    if len(frame) <= n:
+        return frame
+    head = frame.iloc[:n - 1][[label, value]]
+    rest = pd.DataFrame({label: [other], value: [frame[value].iloc[n - 1:].sum()]})
+    return pd.concat([head.astype({label: str}), rest], ignore_index=True)
+
+
+def _compact_array(values, decimals):
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        return pd.to_numeric(pd.Series(arr), downcast="integer").to_numpy(), False
+    if arr.dtype.kind == "f":
+        return np.round(arr, decimals).astype(np.float32), True
+    return None, False
+
+
+def compact(fig, decimals=DECIMALS):
+    # float32 halves the numeric payload; hover labels are formatted so the
+    # float32 rounding noise never shows
+    for trace in fig.data:
+        template = trace.hovertemplate
+        for attr in NUMERIC_ATTRS:
+            if attr not in trace or trace[attr] is None:
+                continue
+            arr, is_float = _compact_array(trace[attr], decimals)
+            if arr is None:
+                continue
+            trace[attr] = arr
+            if is_float and template:
+                template = template.replace(HOVER_REFS[attr], HOVER_REFS[attr][:-1] + f":,.{decimals}f}}")
+        marker = getattr(trace, "marker", None)
+        if marker is not None and "color" in marker and isinstance(marker.color, (np.ndarray, tuple, list)):
+            arr, is_float = _compact_array(marker.color, decimals)
+            if arr is not None:
+                marker.color = arr
+                if is_float and template:
+                    template = template.replace("%{marker.color}", f"%{{marker.color:,.{decimals}f}}")
+        if template:
+            trace.hovertemplate = template
+    return fig
+
+
+def source_pie(counts):
+    # counts: Lead Source, leads
+    counts = top_n(counts, "Lead Source", "leads")
+    return px.pie(counts, names="Lead Source", values="leads", title="Lead Source Distribution",
+                  color_discrete_sequence=px.colors.sequential.Teal)
+
+
+def state_bar(counts):
+    # counts: State, leads (sorted for display)
+    counts = counts.sort_values("leads", ascending=False)
+    return px.bar(counts, x="State", y="leads", title="Leads by State", color="leads",
+                  color_continuous_scale="Teal", labels={"leads": "Leads"})
+
+
+def pull_through_bar(table, dimension, scale, title):
+    return px.bar(table, x=dimension, y="Net Pull Through (%)", color="Net Pull Through (%)",
+                  color_continuous_scale=scale, title=title)
+
+
+def cost_choropleth(geo):
+    return px.choropleth(geo, locationmode="USA-states", locations="State", color="Cost",
+                         scope="usa", color_continuous_scale="Plasma")
+
+
+def forecast_line(view):
+    return px.line(view, x="ds", y="yhat", color="Segment", markers=True, render_mode="webgl",
+                   labels={"ds": "Month", "yhat": "Forecast Cost"}, title="Forecast Monthly Cost")
+
+
+def cohort_heatmap(curve):
+    # curve: Cohort, Lag, Converted (%) in long form (see cohorts.conversion_curve)
+    grid = curve.pivot(index="Cohort", columns="Lag", values="Converted (%)")
+    grid = grid[list(dict.fromkeys(curve["Lag"]))]
+    return px.imshow(grid, aspect="auto", color_continuous_scale="Teal", title="Cumulative Conversion by Cohort",
+                     labels={"x": "Days since created", "y": "Cohort", "color": "Converted (%)"})
+
+
+FIGURES = {
+    "lead_sources": source_pie,
+    "leads_by_state": state_bar,
+    "pull_through_by_state": lambda t: pull_through_bar(t, "State", "Viridis", "📊 Net Pull Through by State (%)"),
+    "pull_through_by_source": lambda t: pull_through_bar(t, "Lead Source", "Plasma",
+                                                         "📊 Net Pull Through by Lead Source (%)"),
+    "cost_map": cost_choropleth,
+    "forecast": forecast_line,
+    "cohort_heatmap": cohort_heatmap,
+}
+
+
+def build_figure(kind, data):
+    return compact(FIGURES[kind](data))
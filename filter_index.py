@@ -0,0 +1,118 @@
+# Row-position indexes behind the sidebar filter bar: per value of Lead Source,
+# State and Stage, the positions of its rows (one stable argsort per column),
+# plus Created Date sorted once. Built per data version; a selection starts from
+# its most selective condition and checks the rest on those rows only.
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ["Lead Source", "State", "Stage"]
+DATE_COLUMN = "Created Date"
+ONE_DAY = np.timedelta64(1, "D")
+
+
+class LeadIndex:
+    def __init__(self, df):
+        self.rows = len(df)
+        self.categories, self.codes, self.order, self.offsets = {}, {}, {}, {}
+        for col in INDEX_COLUMNS:
+            if col not in df.columns:
+                continue
+            values = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype("category")
+            codes = values.cat.codes.to_numpy()
+            self.categories[col] = list(values.cat.categories)
+            self.codes[col] = codes
+            # Rows of category k are order[offsets[k + 1]:offsets[k + 2]]; slot 0 holds missing values
+            self.order[col] = np.argsort(codes, kind="stable").astype(np.int32)
+            counts = np.bincount(codes.astype(np.int64) + 1, minlength=len(self.categories[col]) + 1)
+            self.offsets[col] = np.concatenate([[0], np.cumsum(counts)])
+
+        self.dates = None
+        if DATE_COLUMN in df.columns:
+            self.dates = df[DATE_COLUMN].to_numpy(dtype="datetime64[ns]")
+            self.date_order = np.argsort(self.dates, kind="stable").astype(np.int32)  # NaT sorts last
+            self.sorted_dates = self.dates[self.date_order]
+
+    def values(self, col):
+        return self.categories.get(col, [])
+
+    def date_range(self):
+        if self.dates is None:
+            return None, None
+        valid = self.sorted_dates[~np.isnat(self.sorted_dates)]
+        if not len(valid):
+            return None, None
+        return pd.Timestamp(valid[0]).date(), pd.Timestamp(valid[-1]).date()
+
+    def _value_codes(self, col, values):
+        lookup = {value: code for code, value in enumerate(self.categories[col])}
+        return np.array(sorted({lookup[v] for v in values if v in lookup}), dtype=np.int64)
+
+    def _category_rows(self, col, codes):
+        order, offsets = self.order[col], self.offsets[col]
+        if not len(codes):
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate([order[offsets[c + 1]:offsets[c + 2]] for c in codes])
+
+    def _date_bounds(self, start, end):
+        # Inclusive calendar days; either end may be open
+        lo = np.datetime64(pd.Timestamp(start), "ns") if start is not None else None
+        hi = np.datetime64(pd.Timestamp(end), "ns") + ONE_DAY if end is not None else None
+        return lo, hi
+
+    def select(self, selection):
+        # selection: {column: values} for the indexed columns and
+        # {"Created Date": (start, end)}; returns sorted row positions
+        conditions = []
+        for col, values in selection.items():
+            if col == DATE_COLUMN:
+                lo, hi = self._date_bounds(*values)
+                first = 0 if lo is None else np.searchsorted(self.sorted_dates, lo, "left")
+                last = np.searchsorted(self.sorted_dates, hi, "left") if hi is not None \
+                    else len(self.sorted_dates) - np.isnat(self.sorted_dates).sum()
+                conditions.append((max(last - first, 0), col, (first, last, lo, hi)))
+            else:
+                codes = self._value_codes(col, values)
+                offsets = self.offsets[col]
+                conditions.append((int((offsets[codes + 2] - offsets[codes + 1]).sum()), col, codes))
+
+        if not conditions:
+            return np.arange(self.rows)
+        conditions.sort(key=lambda c: c[0])
+
+        _, col, payload = conditions[0]
+        if col == DATE_COLUMN:
+            first, last, _, _ = payload
+            rows = self.date_order[first:last]
+        else:
+            rows = self._category_rows(col, payload)
+
+        for _, col, payload in conditions[1:]:
+            if not len(rows):
+                break
+            if col == DATE_COLUMN:
+                _, _, lo, hi = payload
+                dates = self.dates[rows]
+                keep = ~np.isnat(dates)
+                if lo is not None:
+                    keep &= dates >= lo
+                if hi is not None:
+                    keep &= dates < hi
+            else:
+                allowed = np.zeros(len(self.categories[col]) + 1, dtype=bool)
+                allowed[payload + 1] = True
+                keep = allowed[self.codes[col][rows].astype(np.int64) + 1]
+            rows = rows[keep]
+        return np.sort(rows)
+
+
+def selection_key(sources=(), states=(), stages=(), dates=None, date_range=(None, None)):
+    # Hashable form of the sidebar state, () when nothing is filtered; a date
+    # range equal to the data's full range is not a filter
+    key = []
+    for col, values in zip(INDEX_COLUMNS, (sources, states, stages)):
+        if values:
+            key.append((col, tuple(values)))
+    if dates and tuple(dates) != tuple(date_range):
+        start, end = (tuple(dates) + (None,))[:2]
+        key.append((DATE_COLUMN, (start, end)))
+    return tuple(key)
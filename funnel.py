@@ -0,0 +1,64 @@
+import numpy as np
+
+from metrics_cube import CUBE_KEYS, measure_frame
+
+DISPLAY_NAMES = {
+    "leads": "Total_Leads",
+    "conversions": "Conversions",
+    "outbound_calls": "Outbound_Calls",
+    "closed_won": "Closed_Won_Count",
+    "cost": "Total_Cost",
+}
+
+TABLE_COLUMNS = [
+    "Total_Leads", "Conversions",
+    "Lead to Set (%)", "Set to Sit (%)", "Sit to Closed-Won (%)",
+    "Net Pull Through (%)", "Total_Cost", "Conversion Rate (%)",
+    "CPA", "CPL",
+]
+
+
+def safe_ratio(num, den, scale=1.0):
+    # NaN instead of inf/ZeroDivisionError when the denominator is 0
+    num = np.asarray(num, dtype="float64")
+    den = np.asarray(den, dtype="float64")
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num * scale, den, out=out, where=den > 0)
+    return np.round(out, 2)
+
+
+def aggregate(data, by):
+    # Accepts the metrics cube (or any roll-up of it) or normalized lead rows
+    if "leads" not in data.columns:
+        data = measure_frame(data, by)
+    measures = [c for c in data.columns if c not in CUBE_KEYS and c not in by]
+    if not by:
+        return data[measures].sum().to_frame().T
+    return data.groupby(by, observed=True)[measures].sum().reset_index()
+
+
+def funnel_table(data, by=(), appointments="appointments_count"):
+    # All funnel ratios for any grouping in one vectorized pass; `appointments`
+    # picks which appointments measure feeds Set to Sit / Sit to Closed-Won
+    by = list(by)
+    grouped = aggregate(data, by).rename(columns={**DISPLAY_NAMES, appointments: "Appointments"})
+
+    leads = grouped["Total_Leads"].to_numpy()
+    conversions = grouped["Conversions"].to_numpy()
+    appts = grouped["Appointments"].to_numpy()
+    closed_won = grouped["Closed_Won_Count"].to_numpy()
+    cost = grouped["Total_Cost"].to_numpy()
+
+    grouped["Lead to Set (%)"] = safe_ratio(conversions, leads, 100)
+    grouped["Set to Sit (%)"] = safe_ratio(appts, conversions, 100)
+    grouped["Sit to Closed-Won (%)"] = safe_ratio(closed_won, appts, 100)
+    grouped["Net Pull Through (%)"] = safe_ratio(closed_won, leads, 100)
+    grouped["Conversion Rate (%)"] = safe_ratio(conversions, leads, 100)
+    grouped["CPA"] = safe_ratio(cost, conversions)
+    grouped["CPL"] = safe_ratio(cost, leads)
+    return grouped
+
+
+def funnel_kpis(data, appointments="appointments"):
+    # Single-row funnel over everything, as a Series keyed by column name
+    return funnel_table(data, (), appointments=appointments).iloc[0]
@@ -1,13 +1,30 @@
+import os
 import streamlit as st
 from streamlit_gsheets import GSheetsConnection
 import pandas as pd
-import numpy as np
-import plotly.express as px
 from streamlit_extras.metric_cards import style_metric_cards
 from streamlit_extras.add_vertical_space import add_vertical_space
 from auth_helper import login_user
-from cost_forecasting import forecast_cost
-from allocation import calculate_budget_allocations
+from cost_forecasting import ENGINES, INPUT_COLUMNS as FORECAST_INPUT_COLUMNS, forecast_cost, forecast_segments
+from allocation import calculate_budget_allocations, fit_response_curves, allocation_grid, allocation_frame
+from allocation import ALLOCATION_COLUMNS, CONVERTED_ONLY, bootstrap_cpa, bootstrap_intervals
+from backends import apply_filters, open_backend, read_frame
+from filter_index import DATE_COLUMN, INDEX_COLUMNS, LeadIndex, selection_key
+from metrics_cube import CUBE_COLUMNS, build_cube, rollup
+from funnel import funnel_table
+from monthly_tables import EXPORT_FORMATS, MIME_TYPES, monthly_table
+from dedupe import DuplicateIndex
+from data_browser import PAGE_SIZES, match_positions, page_count, take_page
+from cards import card_grid_html, fingerprint
+from figures import build_figure
+from reports import kpi_summary, cost_summary, source_breakdown, cost_map
+import tracing
+import warmup
+from warmup import preimport
+from shared_data import dataset
+from sketches import SKETCH_COLUMNS, SketchIndex, build_sketch
+from anomalies import METRICS as ANOMALY_METRICS, THRESHOLD, WINDOW, detect_anomalies
+from cohorts import COHORT_COLUMNS, DIMENSIONS as COHORT_DIMENSIONS, CohortCube, build_cohorts
 
 # --- Neon-glow and glassmorphism styling ---
 st.markdown(
@@ -41,15 +58,264 @@ st.markdown(
     """, unsafe_allow_html=True
 )
 
+# Per-rerun timing spans; sheet fetch counters live for the whole session
+tracer = tracing.start(st.session_state.setdefault("trace_counters", {}),
+                       memory=st.session_state.get("trace_memory", tracing.TRACE_MEMORY))
+tracer.count("reruns")
+
+# --- Data: LEADS_BACKEND picks the source (Google Sheets snapshot by default, or
+# a local Parquet/CSV/SQLite/DuckDB stand-in); see backends.py ---
+conn = st.connection("gsheets", type=GSheetsConnection, ttl = 0)
+backend = open_backend(conn=conn)
+source = backend.name
+
+# Columns each page reads (None = every column) and filters pushed down with them
+PAGE_COLUMNS = {
+    "Performance Dashboard": CUBE_COLUMNS,
+    "Lead Quality": CUBE_COLUMNS,
+    "Conversion Analysis": CUBE_COLUMNS,
+    "Cost Analysis": ["State", "Cost", "Converted Count"],
+    "Lead Overview": None,
+    "Duplicate Leads": None,
+    "Portfolio Allocation": ALLOCATION_COLUMNS,
+    "Forecast": FORECAST_INPUT_COLUMNS,
+    "Alerts": CUBE_COLUMNS,
+}
+PAGE_FILTERS = {
+    "Portfolio Allocation": CONVERTED_ONLY,
+}
+CUBE_PAGES = ("Performance Dashboard", "Lead Quality", "Conversion Analysis", "Cost Analysis", "Alerts")
+APPROX_PAGES = ("Performance Dashboard", "Lead Quality", "Conversion Analysis")
+
+
+def read_leads(source, version, columns=None, filters=None):
+    # Typed once per data version and held once per process (see shared_data);
+    # projections are sliced from the full frame once it is loaded, and every
+    # session gets a copy-on-write view of the same rows
+    def load():
+        with st.spinner("Loading leads..."):
+            with tracing.span("read_frame", columns=None if columns is None else len(columns)):
+                return read_frame(backend, columns, filters)
+    key = (columns, None if filters is None else tuple(map(tuple, filters)))
+    return dataset.get(source, version, key, load)
+
+
+@st.cache_resource(show_spinner="Indexing filters...", max_entries=4)
+def lead_index(source, version):
+    # Read-only once built, so one copy serves every session on this version
+    return LeadIndex(read_leads(source, version, tuple(INDEX_COLUMNS + [DATE_COLUMN]), None))
+
+
+def selected_positions(source, version, selection):
+    # Row positions matching the sidebar filters, or None when nothing is filtered
+    if not selection:
+        return None
+    with tracing.span("filter_index.select", conditions=len(selection)):
+        return lead_index(source, version).select(dict(selection))
+
+
+def selected_leads(source, version, columns=None, filters=None, selection=()):
+    # Sidebar filters resolve through the index on the unfiltered projection;
+    # page filters are pushed down to the backend only when nothing is selected
+    positions = selected_positions(source, version, selection)
+    if positions is None:
+        return read_leads(source, version, columns, filters)
+    leads = read_leads(source, version, columns, None)
+    return apply_filters(leads.take(positions).reset_index(drop=True), filters)
+
+
+def page_leads(page):
+    columns = PAGE_COLUMNS[page]
+    return selected_leads(source, version, None if columns is None else tuple(columns),
+                          PAGE_FILTERS.get(page), selection)
+
+
+@st.cache_data(show_spinner=False)
+def read_cube(source, version, columns, selection):
+    leads = selected_leads(source, version, columns, None, selection)
+    with tracing.span("build_cube"):
+        return build_cube(leads)
+
+
+@st.cache_data(show_spinner="Fitting forecasts...")
+def read_forecasts(source, version, periods, engine, selection=()):
+    # Prophet models are also cached on disk by series fingerprint (see cost_forecasting)
+    leads = selected_leads(source, version, tuple(FORECAST_INPUT_COLUMNS), None, selection)
+    total = pd.DataFrame(forecast_cost(leads, periods, engine=engine)).assign(Dimension="Total", Segment="All")
+    return pd.concat([total, forecast_segments(leads, periods=periods, engine=engine)], ignore_index=True)
+
+
+@st.cache_resource
+def duplicate_index():
+    # Shared across sessions so new snapshot rows are indexed incrementally
+    return DuplicateIndex()
+
+
+@st.cache_resource(show_spinner="Indexing duplicates...", max_entries=2)
+def read_duplicate_groups(source, version):
+    # Full rows, so the groups line up with the Duplicate Leads page's frame.
+    # Kept apart from the shared rows and shared read-only, like the frame itself
+    return duplicate_index().sync(read_leads(source, version, None, None)).groups()
+
+
+@st.cache_resource
+def sketch_index():
+    # Chunk sketches outlive data versions, so a sync only sketches changed chunks
+    return SketchIndex()
+
+
+@st.cache_resource(show_spinner="Sketching leads...", max_entries=8)
+def read_sketch(source, version, selection):
+    # Read-only once merged; filtered views are sketched from their own rows
+    if not selection:
+        leads = read_leads(source, version, tuple(SKETCH_COLUMNS), None)
+        return sketch_index().sync(leads, max_workers=os.cpu_count())
+    leads = selected_leads(source, version, tuple(SKETCH_COLUMNS), None, selection)
+    return build_sketch(leads, max_workers=os.cpu_count())
+
+
+@st.cache_resource
+def cohort_index():
+    # Shared across sessions; a sync recomputes only the cohort months that changed
+    return CohortCube()
+
+
+@st.cache_resource(show_spinner="Building cohorts...", max_entries=8)
+def read_cohorts(source, version, selection):
+    if not selection:
+        return cohort_index().sync(read_leads(source, version, tuple(COHORT_COLUMNS), None)).copy()
+    return build_cohorts(selected_leads(source, version, tuple(COHORT_COLUMNS), None, selection))
+
+
+@st.cache_data(show_spinner=False)
+def read_alerts(source, version, selection, window, threshold):
+    # Scored from the cached cube, so every sync rescans all segments once
+    cube = read_cube(source, version, tuple(CUBE_COLUMNS), selection)
+    return detect_anomalies(cube, window, threshold)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def read_monthly_table(source, version, selection, by):
+    # One groupby and one sort per data version; groups are slices of the result
+    return monthly_table(read_cube(source, version, tuple(CUBE_COLUMNS), selection), by)
+
+
+@st.cache_data(show_spinner="Preparing export...", max_entries=8)
+def export_monthly_table(source, version, selection, by, fmt):
+    return read_monthly_table(source, version, selection, by).export(fmt)
+
+
+def monthly_tables(by, icon):
+    # Only the group picked in the selectbox is turned into a frame and sent
+    table = read_monthly_table(source, version, selection, by)
+    if not len(table):
+        st.info("No monthly data for this selection.")
+        return
+    slug = by.lower().replace(" ", "_")
+    col1, col2, col3 = st.columns([3, 1, 1])
+    group = col1.selectbox(f"{icon} {by}", table.labels, key=f"monthly_{slug}_group")
+    fmt = col2.selectbox("Export format", EXPORT_FORMATS, key=f"monthly_{slug}_format", format_func=str.upper)
+    with col3:
+        add_vertical_space(1)
+        st.download_button("⬇️ Export all", export_monthly_table(source, version, selection, by, fmt),
+                           file_name=f"monthly_by_{slug}.{fmt}", mime=MIME_TYPES[fmt], key=f"monthly_{slug}_export")
+    with tracing.span("render", element=f"monthly_{slug}"):
+        st.dataframe(table.group(group), use_container_width=True)
+
+
+BUDGET_MIN, BUDGET_MAX, BUDGET_STEP = 1000, 1_000_000, 1000
+
+
+@st.cache_data(show_spinner=False)
+def read_response_curves(source, version, selection=()):
+    return fit_response_curves(read_cube(source, version, tuple(CUBE_COLUMNS), selection))
+
+
+@st.cache_data(show_spinner="Optimizing budget grid...")
+def read_allocation_grid(source, version, min_spend, max_spend, selection=()):
+    # Every slider position solved up front; moving the slider is a row lookup
+    curves = read_response_curves(source, version, selection)
+    return allocation_grid(curves, BUDGET_MAX, BUDGET_STEP, min_spend, max_spend)
+
+
+@st.cache_data(show_spinner="Resampling leads...")
+def read_bootstrap_cpa(source, version, n_boot, selection=()):
+    # Resampled CPAs are budget-independent, so the slider only rescales them
+    leads = selected_leads(source, version, tuple(ALLOCATION_COLUMNS), CONVERTED_ONLY, selection)
+    return bootstrap_cpa(leads, n_boot=n_boot, max_workers=os.cpu_count())
+
+
+@st.cache_data(show_spinner=False)
+def source_cards_html(fingerprint, _cards):
+    return card_grid_html(_cards)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def cached_figure(kind, fingerprint, _data):
+    # Keyed by a fingerprint of the chart's aggregate, so reruns on unchanged
+    # data reuse the slimmed figure (shared read-only across sessions)
+    return build_figure(kind, _data)
+
+
+def chart(kind, data):
+    with tracing.span("figure", chart=kind):
+        fig = cached_figure(kind, fingerprint(data), data)
+    # Figure serialization and transfer, timed apart from building the figure
+    with tracing.span("render", element=kind):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def browse(frame, key):
+    # Server-side paging: filtering, sorting and projection happen here and only
+    # the current page is sent to the browser
+    c1, c2, c3 = st.columns([3, 2, 1])
+    search = c1.text_input("Search", key=f"{key}_search")
+    sort_by = c2.selectbox("Sort by", [None] + list(frame.columns), key=f"{key}_sort")
+    ascending = c3.toggle("Ascending", value=True, key=f"{key}_asc")
+    columns = st.multiselect("Columns", list(frame.columns), key=f"{key}_cols")
+
+    with tracing.span("match_positions", search=bool(search), sort_by=sort_by):
+        positions = match_positions(frame, search=search, sort_by=sort_by, ascending=ascending)
+    total = len(positions)
+
+    c4, c5 = st.columns([1, 1])
+    page_size = c4.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+    pages = page_count(total, page_size)
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page_no = c5.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=f"{key}_page")
+
+    with tracing.span("render", element=key):
+        st.dataframe(take_page(frame, positions, page_no, page_size, columns), use_container_width=True)
+    first = (page_no - 1) * page_size
+    st.caption(f"Rows {min(first + 1, total):,}–{min(first + page_size, total):,} of {total:,}")
+
+
+def warmup_steps():
+    # The first dashboard render's calls, with the same arguments so they land
+    # on the same cache keys: sync, full frame, then the filter index and cube,
+    # whose projections are sliced from it
+    return [
+        ("preimport", preimport),
+        ("backend.refresh", backend.refresh),
+        ("read_leads", lambda: read_leads(source, backend.version(), None, None)),
+        ("lead_index", lambda: lead_index(source, backend.version())),
+        ("read_cube", lambda: read_cube(source, backend.version(), tuple(CUBE_COLUMNS), ())),
+    ]
+
 
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
 if not st.session_state.authenticated:
+    # Data and heavy imports load in the background while the user signs in
+    warmup.start(warmup_steps())
     st.markdown("## 🔐 Login")
     email = st.text_input("Enter your email").strip().lower()
     if st.button("Login"):
-        if login_user(email):
+        with tracing.span("login"):
+            allowed = login_user(email)
+        if allowed:
             st.session_state.authenticated = True
             st.session_state.email = email
             st.success("✅ Login successful")
@@ -59,13 +325,6 @@ if not st.session_state.authenticated:
     st.stop()
 
 
-conn = st.connection("gsheets", type=GSheetsConnection, ttl = 0)
-
-df = conn.read(worksheet="Leads")
-df = df.dropna(how = "all")
-
-
-
 # --- Sidebar Navigation ---
 with st.sidebar:
     st.markdown("""
@@ -74,17 +333,63 @@ with st.sidebar:
     """, unsafe_allow_html=True)
     page = st.radio("Navigate", [
         "Performance Dashboard", "Lead Quality","Conversion Analysis",
-         "Cost Analysis","Lead Overview", "Duplicate Leads","Portfolio Allocation"
+         "Cost Analysis","Lead Overview", "Duplicate Leads","Portfolio Allocation",
+         "Forecast", "Alerts"
     ])
+    refresh = st.button("🔄 Refresh now")
+    approx = st.toggle("≈ Approximate mode", key="approx_mode",
+                       help="Sketch-based counts and quantiles for very large lead volumes")
+    debug = st.toggle("⏱ Debug timings", key="trace_debug")
+    if debug:
+        st.checkbox("Track memory", key="trace_memory")
+
+
+# --- Data sync: usually a no-op after the login warm-up ---
+with tracing.span("backend.refresh", backend=backend.name):
+    backend.refresh(force=refresh)
+version = backend.version()
+
+
+# --- Global filter bar: applies to every page ---
+index = lead_index(source, version)
+date_range = index.date_range()
+with st.sidebar.expander("🔎 Filters"):
+    sources = st.multiselect("Lead Source", index.values("Lead Source"), key="filter_sources")
+    states = st.multiselect("State", index.values("State"), key="filter_states")
+    stages = st.multiselect("Stage", index.values("Stage"), key="filter_stages")
+    dates = None
+    if date_range[0] is not None:
+        dates = st.date_input("Created between", value=date_range, min_value=date_range[0],
+                              max_value=date_range[1], key="filter_dates")
+selection = selection_key(sources, states, stages, dates, date_range)
+positions = selected_positions(source, version, selection)
+if positions is not None:
+    st.sidebar.caption(f"Showing {len(positions):,} of {index.rows:,} leads")
+
+# Each page loads only its declared columns; cube pages never touch the rows.
+# Row frames are shared views, so pages derive new columns into their own
+# frames (assign/Series) rather than writing into df. In approximate mode the
+# row-level numbers the cube can't give (distinct leads and contacts, duplicate
+# and days-to-convert estimates) come from mergeable sketches (see sketches.py);
+# everything the cube has is still read from the cached cube.
+approx = approx and page in APPROX_PAGES
+if approx:
+    with tracing.span("read_sketch"):
+        sketch = read_sketch(source, version, selection)
+if page in CUBE_PAGES:
+    # Approximate Lead Quality takes every number from the sketch
+    if not (approx and page == "Lead Quality"):
+        with tracing.span("read_cube"):
+            cube = read_cube(source, version, tuple(PAGE_COLUMNS[page]), selection)
+        with tracing.span("kpi_summary"):
+            summary = cost_summary(cube) if page == "Cost Analysis" else kpi_summary(cube)
+elif page != "Forecast":
+    with tracing.span("read_leads"):
+        df = page_leads(page)
+st.sidebar.caption(backend.status())
 
 # --- Lead Overview Page ---
 if page == "Performance Dashboard":
-    
-
-    df["Cost"] = pd.to_numeric(df["Cost"], errors="coerce")
-    df["Converted Count"] = pd.to_numeric(df["Converted Count"], errors="coerce")
-    df["Appointments Completed"] = pd.to_numeric(df["Appointments Completed"], errors="coerce")
-    df["Number of Outbound Calls"] = pd.to_numeric(df["Number of Outbound Calls"], errors="coerce")
 
     def format_currency(value):
         if value >= 1_000_000:
@@ -95,13 +400,12 @@ if page == "Performance Dashboard":
             return f"${value:.2f}"
 
 
-    total_leads = len(df)
-    outbound_calls = df["Number of Outbound Calls"].sum()
-    converted = df["Converted Count"].sum()
-    cost = df["Cost"].sum()
-    formatted_cost = format_currency(cost)
-    cpl = round(cost / total_leads, 2)
-    cpa = round(cost / converted, 2) if converted > 0 else 0
+    total_leads = summary["Total Leads"]
+    outbound_calls = summary["Outbound Calls"]
+    converted = summary["Converted"]
+    formatted_cost = format_currency(summary["Total Cost"])
+    cpl = summary["CPL"]
+    cpa = summary["CPA"]
 
     style_metric_cards(border_left_color="#82f7b0")
     col1, col2, col3, col4, col5, col6 = st.columns(6)
@@ -111,107 +415,45 @@ if page == "Performance Dashboard":
     col4.metric("Total Cost", formatted_cost)
     col5.metric("CPA", f"${cpa:,.2f}")
     col6.metric("CPL", f"${cpl:,.2f}")
+    if approx:
+        leads, leads_bound = sketch.distinct("leads")
+        contacts, contacts_bound = sketch.distinct("contacts")
+        st.caption(f"≈ Distinct leads {leads:,.0f} ± {leads_bound:,.0f} · distinct contacts "
+                   f"{contacts:,.0f} ± {contacts_bound:,.0f} (HyperLogLog, ~95%)")
 
     st.markdown("""
         <h3 style='color:#ffffff;'>📊 Breakdown by Source</h3>
     """, unsafe_allow_html=True)
 
-    # Styles
-    st.markdown("""
-        <style>
-        .custom-card {
-            border-radius: 10px;
-            padding: 1.2rem;
-            background-color: #ffffff;
-            box-shadow: 0 2px 6px rgba(0, 0, 0, 0.08);
-            border-left: 5px solid #82f7b0;
-            margin-bottom: 1rem;
-        }
-
-        .custom-title {
-            font-size: 1.2rem;
-            font-weight: 700;
-            margin-bottom: 0.6rem;
-            color: #222;
-        }
-
-        .custom-metrics {
-            font-size: 1rem;
-            color: #333;
-            line-height: 1.6;
-            font-weight: 500;
-        }
-
-        .custom-metrics span {
-            display: inline-block;
-            margin-right: 1.5rem;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-
-    grouped = df.groupby("Lead Source").agg({
-        "Lead ID": "count",
-        "Converted Count": "sum",
-        "Number of Outbound Calls": "sum",
-        "Cost": "sum"
-    }).reset_index()
-
-    grouped["CPL"] = round(grouped["Cost"] / grouped["Lead ID"], 2)
-    grouped["CPA"] = round(grouped["Cost"] / grouped["Converted Count"].replace(0, np.nan), 2)
-
-    rows = grouped.reset_index(drop=True)
-
-    for i in range(0, len(rows), 2):
-        col1, col2 = st.columns(2)
-
-        # Card 1
-        with col1:
-            row = rows.iloc[i]
-            st.markdown(f"""
-                <div class="custom-card">
-                    <div class="custom-title">{row['Lead Source']}</div>
-                    <div class="custom-metrics">
-                        <span>Leads: <strong>{int(row['Lead ID'])}</strong></span>
-                        <span>Converted: <strong>{int(row['Converted Count'])}</strong></span>
-                        <span>Calls: <strong>{int(row['Number of Outbound Calls'])}</strong></span>
-                    </div>
-                    <div class="custom-metrics">
-                        <span>Cost: <strong>${row['Cost']:.2f}</strong></span>
-                        <span>CPA: <strong>${row['CPA'] if not np.isnan(row['CPA']) else 0:.2f}</strong></span>
-                        <span>CPL: <strong>${row['CPL']:.2f}</strong></span>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-
-        # Card 2 if available
-        if i + 1 < len(rows):
-            with col2:
-                row = rows.iloc[i + 1]
-                st.markdown(f"""
-                    <div class="custom-card">
-                        <div class="custom-title">{row['Lead Source']}</div>
-                        <div class="custom-metrics">
-                            <span>Leads: <strong>{int(row['Lead ID'])}</strong></span>
-                            <span>Converted: <strong>{int(row['Converted Count'])}</strong></span>
-                            <span>Calls: <strong>{int(row['Number of Outbound Calls'])}</strong></span>
-                        </div>
-                        <div class="custom-metrics">
-                            <span>Cost: <strong>${row['Cost']:.2f}</strong></span>
-                            <span>CPA: <strong>${row['CPA'] if not np.isnan(row['CPA']) else 0:.2f}</strong></span>
-                            <span>CPL: <strong>${row['CPL']:.2f}</strong></span>
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
+    # One cached HTML fragment for the whole grid, rebuilt only when the aggregates change
+    with tracing.span("source_cards"):
+        cards = source_breakdown(cube)
+        st.markdown(source_cards_html(fingerprint(cards), cards), unsafe_allow_html=True)
 
 
 # --- Lead Quality Page ---
 elif page == "Lead Quality":
     st.title("📈 Lead Quality Dashboard")
 
-    total_leads = len(df)
-    duplicate_count = df.duplicated(subset=["First Name", "Zip Code"], keep=False).sum()
-    lead_source_counts = df["Lead Source"].value_counts()
-    leads_by_state = df["State"].value_counts()
+    duplicate_help = None
+    if approx:
+        # Sketch estimates: count-min counts overestimate by at most error()
+        total_leads = sketch.rows
+        duplicates, bound = sketch.duplicates()
+        duplicate_count = f"≈ {duplicates:,.0f}"
+        duplicate_help = f"± {bound:,.0f} (~95%); exact State + Zip + name matches only"
+        lead_source_counts = sketch.top("Lead Source")
+        leads_by_state = sketch.top("State")
+    else:
+        total_leads = summary["Total Leads"]
+        with tracing.span("duplicate_groups"):
+            groups = read_duplicate_groups(source, version)
+            if positions is not None:
+                groups = groups.iloc[positions]
+            duplicate_count = int(groups.notna().sum())
+        with tracing.span("rollup"):
+            lead_source_counts = rollup(cube, ["Lead Source"])[["Lead Source", "leads"]]
+            leads_by_state = rollup(cube, ["State"])[["State", "leads"]]
 
     style_metric_cards(border_left_color="#00f7ff", border_radius_px=10)
     #st.metric("Total Leads", total_leads)
@@ -220,45 +462,30 @@ elif page == "Lead Quality":
     col1, col2 = st.columns(2)
     with col1:
         st.metric("Total Leads", total_leads)
-        fig1 = px.pie(names=lead_source_counts.index, values=lead_source_counts.values,
-                      title="Lead Source Distribution", color_discrete_sequence=px.colors.sequential.Teal)
-        st.plotly_chart(fig1, use_container_width=True)
+        chart("lead_sources", lead_source_counts)
     with col2:
-        st.metric("Duplicate Leads", duplicate_count)
-        fig2 = px.bar(x=leads_by_state.index, y=leads_by_state.values,
-                      title="Leads by State", color=leads_by_state.values,
-                      color_continuous_scale="Teal")
-        st.plotly_chart(fig2, use_container_width=True)
+        st.metric("Duplicate Leads", duplicate_count, help=duplicate_help)
+        chart("leads_by_state", leads_by_state)
+
+    if approx:
+        counts = sketch.counts["Lead Source"]
+        st.caption(f"≈ Counts may overstate by up to {counts.error():,} leads "
+                   f"({counts.confidence():.1%} confidence, count-min)")
+        with st.expander("Top Zip Codes"):
+            st.dataframe(sketch.top("Zip Code", 20), hide_index=True, use_container_width=True)
 
 
 # --- Conversion Analysis Page ---
 elif page == "Conversion Analysis":
     st.title("🔄 Conversion Analysis")
 
-    # Date conversions
-    df["Created Date"] = pd.to_datetime(df["Created Date"], errors="coerce")
-    df["Approval Date"] = pd.to_datetime(df["Approval Date"], errors="coerce")
-
-    # Basic Metrics
-    total_leads = len(df)
-    converted_leads = df["Converted Count"].sum()
-    conversion_rate = round((converted_leads / total_leads) * 100, 2) if total_leads > 0 else 0
-    avg_days = round((df[df["Converted Count"] == 1]["Approval Date"] - df["Created Date"]).dt.days.mean(), 2)
-
-    # --- New Metrics ---
-    # 1. Lead to Set: Percent Completed in Calling
-    lead_to_set = round((converted_leads / total_leads) * 100, 2) if total_leads > 0 else 0
-
-    # 2. Set to Sit: Percent Completed in Appointment
-    appointments_completed = df["Appointments Completed"].sum()
-    set_to_sit = round((appointments_completed / converted_leads) * 100, 2) if converted_leads > 0 else 0
-
-    # 3. Sit to Close-Won: Percent Completed in Closing
-    closed_won_count = df[df["Stage"].str.lower() == "closed-won"]["Appointments Completed"].count()
-    sit_to_close = round((closed_won_count / appointments_completed) * 100, 2) if appointments_completed > 0 else 0
-
-    # 4. Net Pull Through: Leads that actually became paying customers
-    net_pull_through = round((closed_won_count / total_leads) * 100, 2) if total_leads > 0 else 0
+    # Funnel KPIs, rolled up from the cube
+    conversion_rate = summary["Conversion Rate (%)"]
+    avg_days = summary["Avg Days to Convert"]
+    lead_to_set = summary["Lead to Set (%)"]
+    set_to_sit = summary["Set to Sit (%)"]
+    sit_to_close = summary["Sit to Close-Won (%)"]
+    net_pull_through = summary["Net Pull Through (%)"]
 
     style_metric_cards(border_left_color="#fa5bff")
 
@@ -280,140 +507,56 @@ elif page == "Conversion Analysis":
     with col6:
         st.metric("Net Pull Through (%)", net_pull_through)
 
+    if approx:
+        # Quantiles from the t-digest; help shows the range its centroid size allows
+        st.markdown("#### ≈ Days to Convert")
+        for col, (label, q) in zip(st.columns(3), [("25th percentile", 0.25), ("Median", 0.5),
+                                                  ("90th percentile", 0.9)]):
+            low, days, high = sketch.days.interval(q)
+            col.metric(f"{label} (days)", f"{days:,.1f}", help=f"Between {low:,.1f} and {high:,.1f} days")
+
     # --- Net Pull Through State-wise ---
-    state_group = df.groupby("State").agg(
-        total_leads=("Lead ID", "count"),
-        closed_won=("Stage", lambda x: (x.str.lower() == "closed-won").sum())
-    ).reset_index()
-    state_group["net_pull_through"] = round((state_group["closed_won"] / state_group["total_leads"]) * 100, 2)
-
-    fig_state = px.bar(
-        state_group,
-        x="State",
-        y="net_pull_through",
-        color="net_pull_through",
-        color_continuous_scale="Viridis",
-        title="📊 Net Pull Through by State (%)",
-        labels={"net_pull_through": "Net Pull Through (%)"}
-    )
-    
+    with tracing.span("funnel_table", by="State"):
+        state_group = funnel_table(cube, ["State"])[["State", "Net Pull Through (%)"]]
+
 
     # --- Net Pull Through Lead Source-wise ---
-    source_group = df.groupby("Lead Source").agg(
-        total_leads=("Lead ID", "count"),
-        closed_won=("Stage", lambda x: (x.str.lower() == "closed-won").sum())
-    ).reset_index()
-    source_group["net_pull_through"] = round((source_group["closed_won"] / source_group["total_leads"]) * 100, 2)
-
-    fig_source = px.bar(
-        source_group,
-        x="Lead Source",
-        y="net_pull_through",
-        color="net_pull_through",
-        color_continuous_scale="Plasma",
-        title="📊 Net Pull Through by Lead Source (%)",
-        labels={"net_pull_through": "Net Pull Through (%)"}
-    )
-    
+    with tracing.span("funnel_table", by="Lead Source"):
+        source_group = funnel_table(cube, ["Lead Source"])[["Lead Source", "Net Pull Through (%)"]]
     st.markdown("### 📈 Net Pull Through Breakdown")
     
     chart_col1, chart_col2 = st.columns(2)
     with chart_col1:
-        st.plotly_chart(fig_state, use_container_width=True)
+        chart("pull_through_by_state", state_group)
     with chart_col2:
-        st.plotly_chart(fig_source, use_container_width=True)
+        chart("pull_through_by_source", source_group)
+
+    # --- Time to convert by Created Date cohort ---
+    st.markdown("### 🧮 Time to Convert by Cohort")
+    with tracing.span("read_cohorts"):
+        cohorts = read_cohorts(source, version, selection)
+    cohort_col1, cohort_col2 = st.columns(2)
+    cohort_dim = cohort_col1.radio("Cohorts by", COHORT_DIMENSIONS, horizontal=True, key="cohort_dimension")
+    segment = cohort_col2.selectbox(cohort_dim, ["All"] + sorted(cohorts.segments[cohort_dim]),
+                                    key=f"cohort_segment_{cohort_dim}")
+    curve = cohorts.conversion_curve(cohort_dim, None if segment == "All" else segment)
+    if curve.empty:
+        st.info("No cohorts in this selection.")
+    else:
+        chart("cohort_heatmap", curve)
+    with st.expander(f"Days to convert by {cohort_dim}"):
+        st.dataframe(cohorts.lag_quantiles(cohort_dim), hide_index=True, use_container_width=True)
 
 
      # Toggle for Table View
     st.markdown("### 📅 Monthly Conversion Summary")
-    if st.button("📋 See Detailed Monthly Table"):
-        # Load and preprocess data
-        df["Created Date"] = pd.to_datetime(df["Created Date"], errors="coerce")
-        df["Approval Date"] = pd.to_datetime(df["Approval Date"], errors="coerce")
-
-        # Create 'Month-Year' column
-        df["Month-Year"] = pd.to_datetime(df["Created Date"]).dt.to_period("M").astype(str)
-
-        # Calculate closed-won flag
-        df["Closed-Won"] = df["Stage"].str.lower() == "closed-won"
-
-        # Grouped summary
-        grouped = df.groupby(['Lead Source', 'Month-Year']).agg(
-            Total_Leads=("Lead ID", "count"),
-            Conversions=("Converted Count", "sum"),
-            Appointments=("Appointments Completed (Count)", "sum"),
-            Outbound_Calls=("Number of Outbound Calls", "sum"),
-            Closed_Won_Count=("Closed-Won", "sum"),
-            Total_Cost=("Cost", "sum")
-        ).reset_index()
-
-        # Compute derived metrics
-        grouped["Lead to Set (%)"] = round((grouped["Conversions"] / grouped["Total_Leads"]) * 100, 2)
-        grouped["Set to Sit (%)"] = round((grouped["Appointments"] / grouped["Conversions"]) * 100, 2)
-        grouped["Sit to Closed-Won (%)"] = round((grouped["Closed_Won_Count"] / grouped["Appointments"]) * 100, 2)
-        grouped["Net Pull Through (%)"] = round((grouped["Closed_Won_Count"] / grouped["Total_Leads"]) * 100, 2)
-        grouped["Conversion Rate (%)"] = round((grouped["Conversions"] / grouped["Total_Leads"]) * 100, 2)
-        grouped["CPA"] = round(grouped["Total_Cost"] / grouped["Conversions"].replace(0, pd.NA), 2)
-        grouped["CPL"] = round(grouped["Total_Cost"] / grouped["Total_Leads"].replace(0, pd.NA), 2)
-
-
-        lead_sources = grouped['Lead Source'].unique()
-
-        for source in lead_sources:
-            st.subheader(f"📌 Lead Source: {source}")
-            st.dataframe(
-                grouped[grouped["Lead Source"] == source][[
-                    "Month-Year", "Total_Leads", "Conversions", 
-                    "Lead to Set (%)", "Set to Sit (%)", "Sit to Closed-Won (%)",
-                    "Net Pull Through (%)", "Total_Cost", "Conversion Rate (%)", 
-                    "CPA", "CPL"
-                ]].sort_values("Month-Year"),
-                use_container_width=True
-            )
+    if st.toggle("📋 See Detailed Monthly Table", key="monthly_by_source"):
+        monthly_tables("Lead Source", "📌")
 
 
     #st.markdown("### 📍 Monthly Conversion Summary by State")
-    if st.button("📊 See Table by State"):
-        # Load and preprocess data
-        df["Created Date"] = pd.to_datetime(df["Created Date"], errors="coerce")
-        df["Approval Date"] = pd.to_datetime(df["Approval Date"], errors="coerce")
-
-        # Create 'Month-Year' column
-        df["Month-Year"] = pd.to_datetime(df["Created Date"]).dt.to_period("M").astype(str)
-
-        # Calculate closed-won flag
-        df["Closed-Won"] = df["Stage"].str.lower() == "closed-won"
-
-        grouped_state = df.groupby(['State', 'Month-Year']).agg(
-            Total_Leads=("Lead ID", "count"),
-            Conversions=("Converted Count", "sum"),
-            Appointments=("Appointments Completed (Count)", "sum"),
-            Outbound_Calls=("Number of Outbound Calls", "sum"),
-            Closed_Won_Count=("Closed-Won", "sum"),
-            Total_Cost=("Cost", "sum")
-        ).reset_index()
-
-        # Derived metrics
-        grouped_state["Lead to Set (%)"] = round((grouped_state["Conversions"] / grouped_state["Total_Leads"]) * 100, 2)
-        grouped_state["Set to Sit (%)"] = round((grouped_state["Appointments"] / grouped_state["Conversions"]) * 100, 2)
-        grouped_state["Sit to Closed-Won (%)"] = round((grouped_state["Closed_Won_Count"] / grouped_state["Appointments"]) * 100, 2)
-        grouped_state["Net Pull Through (%)"] = round((grouped_state["Closed_Won_Count"] / grouped_state["Total_Leads"]) * 100, 2)
-        grouped_state["Conversion Rate (%)"] = round((grouped_state["Conversions"] / grouped_state["Total_Leads"]) * 100, 2)
-        grouped_state["CPA"] = round(grouped_state["Total_Cost"] / grouped_state["Conversions"].replace(0, pd.NA), 2)
-        grouped_state["CPL"] = round(grouped_state["Total_Cost"] / grouped_state["Total_Leads"].replace(0, pd.NA), 2)
-
-        states = grouped_state["State"].unique()
-        for state in states:
-            st.subheader(f"🏷 State: {state}")
-            st.dataframe(
-                grouped_state[grouped_state["State"] == state][[
-                    "Month-Year", "Total_Leads", "Conversions", 
-                    "Lead to Set (%)", "Set to Sit (%)", "Sit to Closed-Won (%)",
-                    "Net Pull Through (%)", "Total_Cost", "Conversion Rate (%)", 
-                    "CPA", "CPL"
-                ]].sort_values("Month-Year"),
-                use_container_width=True
-            )
+    if st.toggle("📊 See Table by State", key="monthly_by_state"):
+        monthly_tables("State", "🏷")
 
 
 
@@ -422,14 +565,9 @@ elif page == "Conversion Analysis":
 elif page == "Cost Analysis":
     st.title("💸 Cost Breakdown")
 
-    df["Cost"] = pd.to_numeric(df["Cost"], errors="coerce")
-    df["Converted Count"] = pd.to_numeric(df["Converted Count"], errors="coerce")
-    total_cost = df["Cost"].sum()
-    total_leads = len(df)
-    total_converted = df["Converted Count"].sum()
-
-    cpl = round(total_cost / total_leads, 2)
-    cpa = round(total_cost / total_converted, 2) if total_converted else 0
+    total_cost = summary["Total Cost"]
+    cpl = summary["CPL"]
+    cpa = summary["CPA"]
 
     style_metric_cards(border_left_color="#ffb74d")
     col1, col2, col3 = st.columns(3)
@@ -438,43 +576,44 @@ elif page == "Cost Analysis":
     col3.metric("CPA", cpa)
 
     st.subheader("📍 Cost by State (Map)")
-    geo_df = df.groupby("State").agg({"Cost": "sum"}).reset_index()
-    fig_map = px.choropleth(geo_df, locationmode="USA-states", locations="State",
-                            color="Cost", scope="usa", color_continuous_scale="Plasma")
-    st.plotly_chart(fig_map, use_container_width=True)
+    chart("cost_map", cost_map(cube))
 
 
 # --- Lead Overview ---
 elif page == "Lead Overview":
     st.title("🔍 Lead Overview")
-    st.dataframe(df)
+    browse(df, "overview")
 
 
 # --- Duplicate Leads Page ---
 elif page == "Duplicate Leads":
     st.title("🧬 Duplicate Leads")
-    duplicates = df[df.duplicated(subset=["State", "Zip Code", "First Name"], keep=False)]
-    st.dataframe(duplicates)
+    with tracing.span("duplicate_groups"):
+        groups = read_duplicate_groups(source, version)
+        if positions is not None:
+            groups = groups.iloc[positions]
+    duplicates = df.assign(**{"Duplicate Group": groups.to_numpy()})[groups.notna().to_numpy()]
+    duplicates = duplicates.sort_values("Duplicate Group")
+    browse(duplicates, "duplicates")
 
 # --- Portfolio Allocation Page ---
 elif page == "Portfolio Allocation":
     st.title("Portfolio Allocation")
 
-    # Load your main dataset
-    def load_data():
-        df['Converted'] = df['Converted'].astype(str).str.upper() == 'TRUE'
-        return df
-
-    df = load_data()
-
     # Budget input slider
     st.subheader("💰 Lead Budget Allocation")
-    budget = st.slider("Select your total budget", min_value=1000, max_value=1_000_000, step=1000, value=100000)
+    budget = st.slider("Select your total budget", min_value=BUDGET_MIN, max_value=BUDGET_MAX, step=BUDGET_STEP, value=100000)
 
     # Run allocation calculation
-    grouped, uniform_total, weighted_total = calculate_budget_allocations(df, budget)
+    with tracing.span("calculate_budget_allocations"):
+        grouped, uniform_total, weighted_total = calculate_budget_allocations(df, budget)
     st.write("Unique values in 'Converted':", df['Converted'].unique())
 
+    show_uncertainty = st.checkbox("Show 90% bootstrap intervals")
+    if show_uncertainty and not grouped.empty:
+        sources, cpa_samples = read_bootstrap_cpa(source, version, 1000, selection)
+        interval_table, interval_totals = bootstrap_intervals(sources, cpa_samples, budget)
+
     if grouped.empty:
         st.warning("No converted data available to allocate budget. Please check data quality.")
     else:
@@ -484,13 +623,89 @@ elif page == "Portfolio Allocation":
         with col1:
             st.markdown("### 🔵 Uniform Allocation")
             st.metric(label="Predicted Closed-Won", value=f"{int(uniform_total):,}")
+            if show_uncertainty:
+                low, high = interval_totals['Uniform Predicted Conversions']
+                st.caption(f"90% CI: {low:,.0f} – {high:,.0f}")
             st.dataframe(grouped[['Lead Source', 'Uniform Allocation', 'Uniform Predicted Conversions']])
 
         with col2:
             st.markdown("### 🟢 Weighted Allocation")
             st.metric(label="Predicted Closed-Won", value=f"{int(weighted_total):,}")
+            if show_uncertainty:
+                low, high = interval_totals['Weighted Predicted Conversions']
+                st.caption(f"90% CI: {low:,.0f} – {high:,.0f}")
             st.dataframe(grouped[['Lead Source', 'Weighted Allocation', 'Weighted Predicted Conversions']])
 
+        if show_uncertainty:
+            with st.expander("Per-source bootstrap intervals"):
+                st.dataframe(interval_table, use_container_width=True)
+
+    # Optimized allocation on concave spend-to-conversion curves fitted per source
+    st.markdown("### 🟣 Optimized Allocation (diminishing returns)")
+    curves = read_response_curves(source, version, selection)
+    limits = st.data_editor(
+        curves[['Lead Source']].assign(**{'Min Spend': 0.0, 'Max Spend': float(BUDGET_MAX)}),
+        disabled=['Lead Source'], hide_index=True, key="allocation_limits"
+    )
+    budgets, allocations = read_allocation_grid(
+        source, version, tuple(limits['Min Spend']), tuple(limits['Max Spend']), selection
+    )
+    optimized = allocation_frame(curves, allocations[budget // BUDGET_STEP - 1])
+    st.metric(label="Predicted Closed-Won", value=f"{int(optimized['Optimized Predicted Conversions'].sum()):,}")
+    st.dataframe(optimized.join(curves[['b']].rename(columns={'b': 'Elasticity'})))
+
+
+# --- Forecast Page ---
+elif page == "Forecast":
+    st.title("🔮 Cost Forecast")
+
+    periods = st.slider("Months to forecast", min_value=1, max_value=12, value=3)
+    engine = st.selectbox("Engine", ENGINES, format_func=lambda e: {"smoothing": "Exponential smoothing (fast)", "prophet": "Prophet"}[e])
+    with tracing.span("read_forecasts", engine=engine):
+        forecasts = read_forecasts(source, version, periods, engine, selection)
+
+    dimension = st.radio("Forecast by", ["Total", "Lead Source", "State"], horizontal=True)
+    view = forecasts[forecasts["Dimension"] == dimension]
+    segments = sorted(view["Segment"].unique())
+    if dimension != "Total":
+        selected = st.multiselect("Segments", segments, default=segments[:5])
+        view = view[view["Segment"].isin(selected)]
+
+    if view.empty:
+        st.warning("Not enough monthly history to forecast this selection.")
+    else:
+        chart("forecast", view[["Segment", "ds", "yhat"]])
+        st.dataframe(view[["Segment", "ds", "yhat", "yhat_lower", "yhat_upper"]], use_container_width=True)
+
+
+# --- Alerts Page ---
+elif page == "Alerts":
+    st.title("🚨 Cost & CPA Alerts")
+
+    col1, col2, col3 = st.columns(3)
+    window = col1.slider("Baseline months", min_value=3, max_value=12, value=WINDOW)
+    threshold = col2.slider("Robust z threshold", min_value=2.0, max_value=8.0, value=THRESHOLD, step=0.5)
+    latest_only = col3.toggle("Latest month only")
+    with tracing.span("read_alerts"):
+        alerts = read_alerts(source, version, selection, window, threshold)
+    metrics = st.multiselect("Metrics", ANOMALY_METRICS, default=ANOMALY_METRICS)
+    alerts = alerts[alerts["Metric"].isin(metrics)]
+    if latest_only:
+        alerts = alerts[alerts["Latest"]]
+
+    style_metric_cards(border_left_color="#ff5b5b")
+    col4, col5, col6 = st.columns(3)
+    col4.metric("Alerts", len(alerts))
+    col5.metric("Segments Flagged", len(alerts[["Level", "Segment"]].drop_duplicates()))
+    col6.metric("Spikes", int((alerts["Direction"] == "spike").sum()))
+
+    if alerts.empty:
+        st.success("No anomalies at this threshold.")
+    else:
+        st.dataframe(alerts.drop(columns=["Latest"]), hide_index=True, use_container_width=True)
+    st.caption(f"Each month is scored against the median and MAD of the {window} months before it, "
+               "per Lead Source, State and Lead Source × State.")
+
 
 # Add a footer
 add_vertical_space(3)
@@ -498,3 +713,32 @@ st.markdown(
     "<p style='text-align:center;color:#444;font-size:13px;'>Made with 💙 by Naman • LMS Dashboard v2.0</p>",
     unsafe_allow_html=True
 )
+
+# --- Rerun trace: appended to LEADS_TRACE_FILE when set, optionally shown in the sidebar ---
+tracer.finish()
+tracer.write(session=st.session_state.setdefault("trace_session", os.urandom(4).hex()),
+             page=page, backend=source, version=version)
+if debug:
+    with st.sidebar.expander("⏱ Rerun timings", expanded=True):
+        st.caption(f"Rerun: {tracer.seconds * 1000:,.0f} ms · "
+                   f"sheet fetches this session: {tracer.counters.get('sheet_fetches', 0)} · "
+                   f"reruns: {tracer.counters.get('reruns', 0)}")
+        frames, nbytes = dataset.usage(source)
+        st.caption(f"Shared leads: {frames} projection(s) · {nbytes / 2**20:,.1f} MB for all sessions")
+        spans = pd.DataFrame(tracer.spans)
+        if not spans.empty:
+            spans["name"] = spans["depth"].map(lambda depth: "  " * depth) + spans["name"]
+            st.dataframe(spans.drop(columns=["depth"]), hide_index=True, use_container_width=True)
+        # Last login warm-up in this process
+        warm = warmup.status()
+        if warm["running"]:
+            st.caption("Warm-up: running")
+        elif warm["spans"]:
+            steps = [span for span in warm["spans"] if span["depth"] == 0]
+            st.caption(f"Warm-up: {sum(span.get('ms', 0) for span in steps):,.0f} ms over {len(steps)} step(s)")
+        if warm["error"]:
+            st.warning(f"Warm-up failed at {warm['error']}")
+        if warm["spans"]:
+            warm_spans = pd.DataFrame(warm["spans"])
+            warm_spans["name"] = warm_spans["depth"].map(lambda depth: "  " * depth) + warm_spans["name"]
+            st.dataframe(warm_spans.drop(columns=["depth"]), hide_index=True, use_container_width=True)
@@ -0,0 +1,58 @@
+import pandas as pd
+
+CUBE_KEYS = ["Lead Source", "State", "Month-Year", "Stage"]
+
+# measure name -> source column on the normalized frame (see schema.py)
+MEASURES = {
+    "conversions": "Converted Count",
+    "appointments": "Appointments Completed",
+    "appointments_count": "Appointments Completed (Count)",
+    "outbound_calls": "Number of Outbound Calls",
+    "closed_won": "Closed-Won",
+    "cost": "Cost",
+}
+
+# Everything build_cube reads; pages built on the cube only load these
+CUBE_COLUMNS = CUBE_KEYS + list(MEASURES.values()) + ["Created Date", "Approval Date"]
+
+
+def measure_frame(df, keys=()):
+    # Per-lead additive measures (plus any key columns) ready for a groupby-sum
+    frame = pd.DataFrame({k: df[k] for k in keys})
+    frame["leads"] = 1
+    for name, col in MEASURES.items():
+        if col in df.columns:
+            frame[name] = df[col].fillna(0)
+
+    # Days to convert is kept as sum + count so the mean stays additive
+    if {"Approval Date", "Created Date", "Converted Count"} <= set(df.columns):
+        days = (df["Approval Date"] - df["Created Date"]).dt.days
+        days = days.where(df["Converted Count"] == 1)
+        frame["days_to_convert"] = days.fillna(0)
+        frame["days_to_convert_n"] = days.notna().astype("int32")
+    return frame
+
+
+def build_cube(df):
+    # One scan over the leads; every page rolls this up instead of the raw rows
+    keys = [k for k in CUBE_KEYS if k in df.columns]
+    frame = measure_frame(df, keys)
+    if not keys:
+        return frame.sum().to_frame().T
+    cube = frame.groupby(keys, observed=True, dropna=False, sort=False).sum().reset_index()
+    for col in cube.columns.difference(keys):
+        if col != "cost":
+            cube[col] = pd.to_numeric(cube[col], downcast="integer")
+    return cube
+
+
+def rollup(cube, by=None, dropna=True):
+    measures = [c for c in cube.columns if c not in CUBE_KEYS]
+    if not by:
+        return cube[measures].sum()
+    return cube.groupby(by, observed=True, dropna=dropna)[measures].sum().reset_index()
+
+
+def avg_days_to_convert(totals):
+    n = totals.get("days_to_convert_n", 0)
+    return round(totals["days_to_convert"] / n, 2) if n else float("nan")
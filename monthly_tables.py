@@ -0,0 +1,81 @@
+# Monthly funnel tables for Conversion Analysis. Each table is built once per
+# data version and sorted by group, so every Lead Source / State is a contiguous
+# slice found in one pass; a group's frame is only cut when it is opened.
+# Exports stream the same sorted table in chunks.
+import io
+
+import numpy as np
+import pandas as pd
+
+from funnel import TABLE_COLUMNS, funnel_table
+
+MONTH = "Month-Year"
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_CHUNK_ROWS = 50_000
+MIME_TYPES = {"csv": "text/csv", "parquet": "application/octet-stream"}
+
+
+class GroupedTable:
+    def __init__(self, table, by):
+        self.by = by
+        table = table.dropna(subset=[by, MONTH])
+        codes, labels = pd.factorize(table[by].astype(str), sort=True)
+        months = table[MONTH].astype(str).to_numpy()
+        order = np.lexsort((months, codes))  # by group, then month
+        self.frame = pd.DataFrame({by: np.asarray(labels, dtype=object)[codes[order]], MONTH: months[order]})
+        for col in TABLE_COLUMNS:
+            self.frame[col] = table[col].to_numpy()[order]
+        self.labels = list(labels)
+        # Rows of group i are frame[offsets[i]:offsets[i + 1]]
+        self.offsets = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        self._positions = {label: i for i, label in enumerate(self.labels)}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def sizes(self):
+        return pd.Series(np.diff(self.offsets), index=self.labels, name="Months")
+
+    def group(self, label):
+        i = self._positions[label]
+        return self.frame.iloc[self.offsets[i]:self.offsets[i + 1], 1:].reset_index(drop=True)
+
+    def chunks(self, rows=EXPORT_CHUNK_ROWS):
+        for start in range(0, max(len(self.frame), 1), rows):
+            yield self.frame.iloc[start:start + rows]
+
+    def write_csv(self, out, rows=EXPORT_CHUNK_ROWS):
+        # out: binary file-like; header written with the first chunk only
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+        for i, chunk in enumerate(self.chunks(rows)):
+            chunk.to_csv(text, index=False, header=i == 0)
+        text.flush()
+        text.detach()
+
+    def write_parquet(self, out, rows=EXPORT_CHUNK_ROWS):
+        # One row group per chunk; the schema comes from the (typed) full frame
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.Schema.from_pandas(self.frame.iloc[:0], preserve_index=False)
+        with pq.ParquetWriter(out, schema) as writer:
+            for chunk in self.chunks(rows):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+    def export(self, fmt, out=None, rows=EXPORT_CHUNK_ROWS):
+        # Streams into `out` (path or binary file-like); bytes when out is None
+        buffer = io.BytesIO() if out is None else out
+        if isinstance(buffer, str):
+            with open(buffer, "wb") as f:
+                return self.export(fmt, f, rows)
+        if fmt == "csv":
+            self.write_csv(buffer, rows)
+        elif fmt == "parquet":
+            self.write_parquet(buffer, rows)
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+        return buffer.getvalue() if out is None else None
+
+
+def monthly_table(cube, by):
+    return GroupedTable(funnel_table(cube, [by, MONTH]), by)
@@ -0,0 +1,132 @@
+# Headless versions of the dashboard computations, shared with main.py.
+#   python reports.py --input .cache/leads.parquet --output reports/ --format parquet csv html
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from allocation import calculate_budget_allocations, fit_response_curves, optimize_allocation
+from anomalies import detect_anomalies
+from backends import backend_for_path, read_frame
+from cards import source_card_frame
+from dedupe import DuplicateIndex
+from funnel import funnel_kpis, funnel_table
+from metrics_cube import avg_days_to_convert, build_cube, rollup
+from snapshot import prepare_for_parquet
+
+DEFAULT_INPUT = os.path.join(os.environ.get("LEADS_SNAPSHOT_DIR", ".cache"), "leads.parquet")
+FORMATS = ("parquet", "csv", "html")
+
+
+def read_input(path):
+    # Any file backends.py can open: .parquet, .csv, .db/.sqlite, .duckdb
+    return read_frame(backend_for_path(path))
+
+
+def cost_summary(cube):
+    # Cost Analysis headline; only needs leads, conversions and cost in the cube
+    totals = rollup(cube)
+    leads, converted, cost = int(totals["leads"]), int(totals["conversions"]), float(totals["cost"])
+    return pd.Series({
+        "Total Cost": cost,
+        "CPA": round(cost / converted, 2) if converted > 0 else 0,
+        "CPL": round(cost / leads, 2) if leads > 0 else 0,
+    }, dtype=object)
+
+
+def kpi_summary(cube):
+    # Headline numbers of the Performance Dashboard and Conversion Analysis
+    totals = rollup(cube)
+    kpis = funnel_kpis(cube).fillna(0)
+    return pd.Series({
+        "Total Leads": int(totals["leads"]),
+        "Outbound Calls": int(totals["outbound_calls"]),
+        "Converted": int(totals["conversions"]),
+        **cost_summary(cube),
+        "Conversion Rate (%)": kpis["Conversion Rate (%)"],
+        "Avg Days to Convert": avg_days_to_convert(totals),
+        "Lead to Set (%)": kpis["Lead to Set (%)"],
+        "Set to Sit (%)": kpis["Set to Sit (%)"],
+        "Sit to Close-Won (%)": kpis["Sit to Closed-Won (%)"],
+        "Net Pull Through (%)": kpis["Net Pull Through (%)"],
+    }, dtype=object)
+
+
+def source_breakdown(cube):
+    return source_card_frame(rollup(cube, ["Lead Source"]))
+
+
+def cost_map(cube):
+    return rollup(cube, ["State"])[["State", "cost"]].rename(columns={"cost": "Cost"})
+
+
+def duplicate_leads(df):
+    groups = DuplicateIndex().add(df).groups()
+    duplicates = df.assign(**{"Duplicate Group": groups.to_numpy()})[groups.notna().to_numpy()]
+    return duplicates.sort_values("Duplicate Group")
+
+
+def budget_allocation(df, cube, budget):
+    grouped, _, _ = calculate_budget_allocations(df, budget)
+    optimized = optimize_allocation(fit_response_curves(cube), budget)
+    if grouped.empty:
+        return optimized
+    return grouped.merge(optimized, on="Lead Source", how="outer")
+
+
+def build_sections(df, budget=100_000, max_workers=None):
+    # Independent sections run concurrently; each returns a DataFrame
+    cube = build_cube(df)
+    jobs = {
+        "kpis": lambda: kpi_summary(cube).to_frame("Value").rename_axis("Metric").reset_index(),
+        "source_breakdown": lambda: source_breakdown(cube),
+        "funnel_by_source": lambda: funnel_table(cube, ["Lead Source"]),
+        "funnel_by_state": lambda: funnel_table(cube, ["State"]),
+        "monthly_by_source": lambda: funnel_table(cube, ["Lead Source", "Month-Year"]),
+        "monthly_by_state": lambda: funnel_table(cube, ["State", "Month-Year"]),
+        "cost_map": lambda: cost_map(cube),
+        "alerts": lambda: detect_anomalies(cube),
+        "duplicates": lambda: duplicate_leads(df),
+        "allocation": lambda: budget_allocation(df, cube, budget),
+    }
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(job) for name, job in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def write_sections(sections, output, formats=FORMATS):
+    os.makedirs(output, exist_ok=True)
+    written = []
+    for name, frame in sections.items():
+        for fmt in formats:
+            path = os.path.join(output, f"{name}.{fmt}")
+            if fmt == "parquet":
+                prepare_for_parquet(frame).to_parquet(path, index=False)
+            elif fmt == "csv":
+                frame.to_csv(path, index=False)
+            elif fmt == "html":
+                frame.to_html(path, index=False, na_rep="")
+            written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the Lead Analysis dashboard sections to disk.")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Leads file (.parquet, .csv, .db or .duckdb)")
+    parser.add_argument("--output", default="reports", help="Output directory")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["parquet", "csv"])
+    parser.add_argument("--budget", type=float, default=100_000, help="Budget for the allocation section")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = read_input(args.input)
+    sections = build_sections(df, budget=args.budget, max_workers=args.workers)
+    written = write_sections(sections, args.output, args.format)
+    print(f"Wrote {len(written)} files for {len(df):,} leads to {args.output} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ["Lead Source", "State", "Stage"]
+COUNT_COLUMNS = [
+    "Converted Count",
+    "Appointments Completed",
+    "Appointments Completed (Count)",
+    "Number of Outbound Calls",
+]
+MONEY_COLUMNS = ["Cost"]
+DATE_COLUMNS = ["Created Date", "Approval Date"]
+BOOL_COLUMNS = ["Converted"]
+# derived column -> stored column it is computed from in normalize_leads
+DERIVED_COLUMNS = {"Closed-Won": "Stage", "Month-Year": "Created Date"}
+
+
+def to_bool(series):
+    # Sheets hands back TRUE/True/" true " strings or real booleans
+    if series.dtype == bool:
+        return series
+    if pd.api.types.is_numeric_dtype(series):  # SQL tables store booleans as 0/1
+        return series.fillna(0) != 0
+    return series.astype(str).str.strip().str.upper() == "TRUE"
+
+
+def to_count(series):
+    values = pd.to_numeric(series, errors="coerce").fillna(0)
+    return pd.to_numeric(values, downcast="integer")
+
+
+def to_category(series):
+    # Spellings that differ only in case ("closed-won") are folded onto the
+    # most common one, so each value is a single category
+    values = series.astype("string").str.strip().astype("category")
+    categories = values.cat.categories
+    if not len(categories):
+        return values
+    spellings = pd.DataFrame({"value": categories, "key": categories.str.lower(),
+                              "rows": np.bincount(values.cat.codes[values.cat.codes >= 0], minlength=len(categories))})
+    canonical = (spellings.sort_values(["rows", "value"], ascending=[False, True])
+                 .drop_duplicates("key").set_index("key")["value"])
+    folded = spellings["key"].map(canonical)
+    if (folded.to_numpy() == categories.to_numpy()).all():
+        return values
+    new_categories = pd.Index(sorted(canonical))
+    code_map = np.append(new_categories.get_indexer(folded), -1)  # -1 (missing) stays missing
+    return pd.Series(pd.Categorical.from_codes(code_map[values.cat.codes.to_numpy()], new_categories),
+                     index=series.index, name=series.name)
+
+
+def source_columns(columns):
+    # Stored columns a backend must return to produce `columns` after normalizing
+    return list(dict.fromkeys(DERIVED_COLUMNS.get(col, col) for col in columns))
+
+
+def normalize_leads(df, dropna=True):
+    # Coerce every column once at load time so pages never re-parse
+    df = df.dropna(how="all").copy() if dropna else df.copy()
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = to_category(df[col])
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = to_count(df[col])
+    for col in MONEY_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in BOOL_COLUMNS:
+        if col in df.columns:
+            df[col] = to_bool(df[col])
+
+    # Derived columns several pages group on
+    if "Stage" in df.columns:
+        df["Closed-Won"] = (df["Stage"].str.lower() == "closed-won").fillna(False).astype(bool)
+    if "Created Date" in df.columns:
+        df["Month-Year"] = df["Created Date"].dt.strftime("%Y-%m").astype("category")
+
+    return df.reset_index(drop=True)
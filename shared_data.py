@@ -0,0 +1,117 @@
+# One process-wide copy of each lead projection, shared by every session. Frames
+# are stored per data source and only for its latest version, so memory stays
+# flat as users are added and drops the old rows as soon as a new sync lands.
+# Sessions get shallow views: with pandas copy-on-write, anything a page assigns
+# to its view is copied into that view alone and never reaches the shared rows.
+# Keys are (columns, filters) projections as read_frame takes them; a projection
+# is sliced from a wider unfiltered frame when one is held, and loading a wider
+# frame drops the narrower ones it covers, so the rows are held about once.
+import threading
+
+import pandas as pd
+
+from backends import apply_filters
+from schema import DERIVED_COLUMNS, source_columns
+
+if int(pd.__version__.split(".")[0]) < 3:
+    # Default from pandas 3 on; views are only safe to hand out with it enabled
+    pd.set_option("mode.copy_on_write", True)
+
+
+def view(frame):
+    # Same column arrays, separate column mapping; cheap for any frame size
+    return frame.copy(deep=False)
+
+
+def _stored(columns, filters):
+    # Stored columns read_frame loads for a projection; None = every column
+    if columns is None:
+        return None
+    return frozenset(source_columns(["Lead ID", *columns, *(col for col, _, _ in filters or ())]))
+
+
+def covers(wide, narrow):
+    # Whether projection key `wide` holds every row and column `narrow` needs
+    if wide[1] is not None:
+        return False  # filtered frames are missing rows
+    wide_columns, narrow_columns = _stored(*wide), _stored(*narrow)
+    return wide_columns is None or (narrow_columns is not None and narrow_columns <= wide_columns)
+
+
+def project(frame, columns, filters):
+    # The rows and columns read_frame returns for (columns, filters), taken from
+    # a wider normalized frame; column selection shares the arrays (copy-on-write)
+    stored = _stored(columns, filters)
+    if stored is not None:
+        derived = {col for col, source in DERIVED_COLUMNS.items() if source in stored}
+        frame = frame[[col for col in frame.columns if col in stored or col in derived]]
+    return apply_filters(frame, filters)
+
+
+class SharedDataset:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}  # source -> version
+        self._frames = {}    # source -> {key: frame}
+        self._nbytes = {}    # source -> {key: bytes}
+        self._loading = {}   # (source, version, key) -> lock, so concurrent sessions load once
+
+    def _current(self, source, version):
+        # Caller holds the lock; a new version replaces the old frames outright
+        if self._versions.get(source) != version:
+            self._versions[source] = version
+            self._frames[source], self._nbytes[source] = {}, {}
+            self._loading = {k: v for k, v in self._loading.items() if k[0] != source}
+        return self._frames[source]
+
+    def _wider(self, source, key):
+        # Caller holds the lock; a held frame this projection can be sliced from
+        for held, frame in self._frames[source].items():
+            if held != key and covers(held, key):
+                return frame
+        return None
+
+    def get(self, source, version, key, load):
+        # key: (columns, filters) with columns a tuple or None, filters hashable
+        with self._lock:
+            frame = self._current(source, version).get(key)
+            wider = None if frame is not None else self._wider(source, key)
+            if frame is None and wider is None:
+                load_lock = self._loading.setdefault((source, version, key), threading.Lock())
+        if frame is not None:
+            return view(frame)
+        if wider is not None:
+            return view(project(wider, *key))
+
+        with load_lock:
+            with self._lock:
+                frame = self._current(source, version).get(key)
+                wider = None if frame is not None else self._wider(source, key)
+            if wider is not None:
+                return view(project(wider, *key))
+            if frame is None:
+                frame = load()
+                nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+                with self._lock:
+                    # Only kept if no newer version arrived while loading
+                    if self._versions.get(source) == version:
+                        frames, sizes = self._frames[source], self._nbytes[source]
+                        for held in [held for held in frames if covers(key, held)]:
+                            del frames[held], sizes[held]  # now sliced from this one
+                        frames[key] = frame
+                        sizes[key] = nbytes
+        return view(frame)
+
+    def usage(self, source):
+        # (frames held, bytes) for the source's current version
+        with self._lock:
+            sizes = self._nbytes.get(source, {})
+            return len(sizes), sum(sizes.values())
+
+    def clear(self):
+        with self._lock:
+            self._versions, self._frames, self._nbytes, self._loading = {}, {}, {}, {}
+
+
+# Module-level so it outlives reruns: Streamlit re-executes main.py, not imports
+dataset = SharedDataset()
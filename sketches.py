@@ -0,0 +1,306 @@
+# Mergeable sketches behind the dashboard's approximate mode. Each chunk of
+# CHUNK_ROWS leads gets its own LeadSketch; chunks merge into the total in any
+# order (across processes too), and SketchIndex only sketches chunks whose rows
+# changed since the last sync.
+#   HyperLogLog  distinct Lead IDs and contacts (State + Zip + first name)
+#   t-digest     days-to-convert quantiles
+#   count-min    lead counts per Lead Source, State and Zip Code (heavy hitters)
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dedupe import normalize_keys
+
+HLL_PRECISION = 14         # 16384 registers: 0.8% standard error
+TDIGEST_COMPRESSION = 200  # about 100 centroids
+CMS_WIDTH, CMS_DEPTH = 4096, 5
+HEAVY_HITTERS = 64         # candidate values kept per count-min sketch (covers every state)
+CHUNK_ROWS = 250_000
+HASH_KEY = "leads-sketch-key"  # 16 bytes; fixed so chunk hashes agree across processes
+
+SKETCH_COLUMNS = ["Lead ID", "Lead Source", "State", "Zip Code", "First Name",
+                  "Converted Count", "Created Date", "Approval Date"]
+
+
+def hash64(values):
+    values = np.asarray(values)
+    if values.dtype.kind not in "iufb":
+        values = values.astype(object)
+    return pd.util.hash_array(values, hash_key=HASH_KEY)
+
+
+def _bit_length(words):
+    # Exact for uint64: each 32-bit half is exact in float64, and frexp's
+    # exponent is the bit length
+    hi = (words >> np.uint64(32)).astype(np.float64)
+    lo = (words & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rank = np.minimum(65 - _bit_length(hashes << np.uint64(p)), 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def add(self, values):
+        return self.add_hashes(hash64(values))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)  # linear counting for small sets
+        return raw
+
+    def relative_error(self, sigmas=2):
+        return sigmas * 1.04 / np.sqrt(len(self.registers))
+
+
+class TDigest:
+    # Merging t-digest with the k1 (arcsine) scale function: centroids stay
+    # small near the tails, so extreme quantiles are tighter than the median
+    def __init__(self, compression=TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min, self.max = np.inf, -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _compress(self, means, weights):
+        if not len(means):
+            return
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        mid = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * mid - 1)
+        clusters = np.floor(k).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, clusters[1:] != clusters[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.min, self.max = min(self.min, values.min()), max(self.max, values.max())
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other):
+        if len(other.means):
+            self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else float("nan")
+        positions = np.cumsum(self.weights) - self.weights / 2
+        total = self.weights.sum()
+        q = np.clip(q, 0, 1)
+        return np.interp(q * total, np.r_[0, positions, total], np.r_[self.min, self.means, self.max])
+
+    def mean(self):
+        return float((self.means * self.weights).sum() / self.count) if len(self.means) else float("nan")
+
+    def rank_error(self, q):
+        # Half the width, in quantile units, of a full centroid at q
+        return np.pi * np.sqrt(q * (1 - q)) / self.compression
+
+    def interval(self, q):
+        # (low, estimate, high) for quantile q
+        e = self.rank_error(q)
+        return tuple(float(v) for v in self.quantile(np.array([q - e, q, q + e])))
+
+
+class CountMin:
+    # Counts only ever overestimate; the true count is within error() of the
+    # estimate with probability confidence()
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH, capacity=HEAVY_HITTERS):
+        self.width, self.depth, self.capacity = width, depth, capacity
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.candidates = []
+
+    def _columns(self, hashes):
+        # Double hashing: row i uses h1 + i * h2
+        h1 = (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64)
+        h2 = (hashes >> np.uint64(32)).astype(np.int64) | 1
+        rows = np.arange(self.depth, dtype=np.int64)[:, None]
+        return (h1[None, :] + rows * h2[None, :]) % self.width
+
+    def estimate(self, values):
+        if not len(values):
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(hash64(values))
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def _keep_top(self, values):
+        values = list(dict.fromkeys(values))
+        estimates = self.estimate(np.array(values, dtype=object))
+        order = np.argsort(-estimates, kind="stable")[:self.capacity]
+        self.candidates = [values[i] for i in order]
+
+    def add(self, values):
+        values = pd.Series(values).dropna()
+        if not len(values):
+            return self
+        # Each distinct value is hashed once and added with its count
+        codes, uniques = pd.factorize(values)
+        counts = np.bincount(codes, minlength=len(uniques))
+        uniques = np.asarray(uniques, dtype=object).astype(str).astype(object)
+        columns = self._columns(hash64(uniques))
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=counts, minlength=self.width).astype(np.int64)
+        self.total += len(values)
+        self._keep_top(self.candidates + list(uniques))
+        return self
+
+    def merge(self, other):
+        self.table += other.table
+        self.total += other.total
+        self._keep_top(self.candidates + other.candidates)
+        return self
+
+    def error(self):
+        return int(np.ceil(np.e / self.width * self.total))
+
+    def confidence(self):
+        return 1 - np.exp(-self.depth)
+
+    def heavy_hitters(self, k=None):
+        values = self.candidates[:k]
+        return pd.DataFrame({"value": values, "count": self.estimate(np.array(values, dtype=object))})
+
+
+class LeadSketch:
+    def __init__(self):
+        self.rows = 0
+        self.leads = HyperLogLog()
+        self.contacts = HyperLogLog()
+        self.contact_rows = 0
+        self.days = TDigest()
+        self.counts = {"Lead Source": CountMin(), "State": CountMin(), "Zip Code": CountMin()}
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls().add(df)
+
+    def add(self, df):
+        self.rows += len(df)
+        if "Lead ID" in df.columns:
+            self.leads.add(df["Lead ID"].dropna().to_numpy())
+        if {"First Name", "Zip Code", "State"} <= set(df.columns):
+            # Same blocking keys as the duplicate index, matched exactly
+            keys = normalize_keys(df)
+            keys = keys[keys["valid"]]
+            self.contact_rows += len(keys)
+            self.contacts.add((keys["state"] + "|" + keys["zip"] + "|" + keys["name"]).to_numpy())
+        if {"Approval Date", "Created Date", "Converted Count"} <= set(df.columns):
+            days = (df["Approval Date"] - df["Created Date"]).dt.days
+            self.days.add(days[df["Converted Count"] == 1].to_numpy(dtype=float, na_value=np.nan))
+        for col, sketch in self.counts.items():
+            if col in df.columns:
+                sketch.add(df[col])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.contact_rows += other.contact_rows
+        self.leads.merge(other.leads)
+        self.contacts.merge(other.contacts)
+        self.days.merge(other.days)
+        for col, sketch in self.counts.items():
+            sketch.merge(other.counts[col])
+        return self
+
+    def distinct(self, name):
+        # (estimate, +/- bound at ~95%)
+        hll = getattr(self, name)
+        estimate = hll.estimate()
+        return estimate, estimate * hll.relative_error()
+
+    def duplicates(self):
+        # Rows sharing a contact key with an earlier row; fuzzy name matches
+        # (see dedupe) are not counted, so this reads low against the exact page
+        contacts, bound = self.distinct("contacts")
+        return max(self.contact_rows - contacts, 0.0), bound
+
+    def top(self, col, k=None):
+        counts = self.counts[col].heavy_hitters(k)
+        return counts.rename(columns={"value": col, "count": "leads"})
+
+
+def merge_all(sketches):
+    total = LeadSketch()
+    for sketch in sketches:
+        total.merge(sketch)
+    return total
+
+
+def _chunks(df, chunk_rows):
+    return [df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows)]
+
+
+def build_sketch(df, chunk_rows=CHUNK_ROWS, max_workers=None):
+    # One sketch per chunk, optionally across processes, merged into one
+    chunks = _chunks(df, chunk_rows)
+    if max_workers and max_workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return merge_all(pool.map(LeadSketch.from_frame, chunks))
+    return merge_all(map(LeadSketch.from_frame, chunks))
+
+
+def _fingerprint(chunk):
+    # Every sketched column, so leads that convert (or are relabelled) after
+    # their chunk was sketched mark it stale
+    columns = [col for col in SKETCH_COLUMNS if col in chunk.columns]
+    rows = pd.util.hash_pandas_object(chunk[columns], index=False, hash_key=HASH_KEY).to_numpy()
+    return len(chunk), int(rows.sum(dtype=np.uint64))
+
+
+class SketchIndex:
+    # Chunk sketches kept across data versions; a sync re-sketches only chunks
+    # whose rows changed (usually just the last, partly filled one)
+    def __init__(self, chunk_rows=CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+        self._lock = threading.Lock()
+        self._chunks = []  # [(fingerprint, LeadSketch)]
+        self.sketched = 0  # chunks sketched by the last sync
+
+    def sync(self, df, max_workers=None):
+        with self._lock:
+            chunks = _chunks(df, self.chunk_rows)
+            prints = [_fingerprint(chunk) for chunk in chunks]
+            stale = [i for i, fp in enumerate(prints) if i >= len(self._chunks) or self._chunks[i][0] != fp]
+            fresh = [chunks[i] for i in stale]
+            if max_workers and max_workers > 1 and len(fresh) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    sketches = list(pool.map(LeadSketch.from_frame, fresh))
+            else:
+                sketches = [LeadSketch.from_frame(chunk) for chunk in fresh]
+            kept = dict(zip(stale, sketches))
+            self._chunks = [(fp, kept[i] if i in kept else self._chunks[i][1]) for i, fp in enumerate(prints)]
+            self.sketched = len(stale)
+            return merge_all(sketch for _, sketch in self._chunks)
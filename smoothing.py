@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+
+SEASON_LENGTH = 12
+
+# Candidate (alpha, beta, gamma) triples; every series picks its best in one batch
+PARAM_GRID = np.array(list(itertools.product(
+    (0.1, 0.3, 0.5, 0.8),
+    (0.0, 0.05, 0.2),
+    (0.0, 0.1, 0.3),
+)))
+
+
+def _run(y, params, season_length, seasonal):
+    # Additive Holt-Winters over every (param, series) pair at once.
+    # y: (n_series, T); params: (n_params, 3) -> state arrays (n_params, n_series)
+    n_series, n_time = y.shape
+    alpha = params[:, 0, None]
+    beta = params[:, 1, None]
+    gamma = params[:, 2, None] if seasonal else np.zeros_like(alpha)
+
+    season = np.zeros((len(params), n_series, season_length))
+    if seasonal:
+        first = y[:, :season_length]
+        season[:] = first - first.mean(axis=1, keepdims=True)
+        level = np.broadcast_to(y[:, :season_length].mean(axis=1), (len(params), n_series)).copy()
+        trend = np.broadcast_to(
+            (y[:, season_length:2 * season_length].mean(axis=1) - y[:, :season_length].mean(axis=1)) / season_length,
+            (len(params), n_series),
+        ).copy()
+    else:
+        level = np.broadcast_to(y[:, 0], (len(params), n_series)).copy()
+        trend = np.broadcast_to(y[:, 1] - y[:, 0] if n_time > 1 else np.zeros(n_series),
+                                (len(params), n_series)).copy()
+
+    sse = np.zeros((len(params), n_series))
+    for t in range(n_time):
+        s = season[:, :, t % season_length]
+        pred = level + trend + s
+        err = y[:, t] - pred
+        sse += err ** 2
+        prev_level = level
+        level = alpha * (y[:, t] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        season[:, :, t % season_length] = gamma * (y[:, t] - level) + (1 - gamma) * s
+    return level, trend, season, sse
+
+
+def forecast_batch(y, periods=3, season_length=SEASON_LENGTH, param_grid=PARAM_GRID, z=1.96):
+    # y: (n_series, T) monthly values on a shared calendar, NaN treated as 0.
+    # Returns (yhat, lower, upper), each shaped (n_series, periods).
+    y = np.nan_to_num(np.asarray(y, dtype="float64"))
+    n_series, n_time = y.shape
+    seasonal = n_time >= 2 * season_length
+
+    level, trend, season, sse = _run(y, param_grid, season_length, seasonal)
+    best = sse.argmin(axis=0)
+    pick = (best, np.arange(n_series))
+    level, trend, season = level[pick], trend[pick], season[pick]
+    sigma = np.sqrt(sse[pick] / max(n_time, 1))
+
+    h = np.arange(1, periods + 1)
+    season_idx = (n_time + h - 1) % season_length
+    yhat = level[:, None] + trend[:, None] * h + season[:, season_idx]
+    band = z * sigma[:, None] * np.sqrt(h)
+    return yhat, yhat - band, yhat + band
@@ -0,0 +1,97 @@
+import json
+import os
+import time
+
+import pandas as pd
+
+from tracing import count, span
+
+SNAPSHOT_DIR = os.environ.get("LEADS_SNAPSHOT_DIR", ".cache")
+DEFAULT_MAX_AGE = int(os.environ.get("LEADS_SNAPSHOT_MAX_AGE", 15 * 60))  # seconds
+
+
+def prepare_for_parquet(df):
+    # Sheet columns often mix numbers and text (e.g. Zip Code), which Arrow rejects
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _digest(df):
+    if df is None or df.empty:
+        return "0"
+    return str(int(pd.util.hash_pandas_object(df, index=False).sum()))
+
+
+class LeadsSnapshot:
+    def __init__(self, name="leads", directory=SNAPSHOT_DIR, max_age=DEFAULT_MAX_AGE):
+        self.path = os.path.join(directory, f"{name}.parquet")
+        self.meta_path = os.path.join(directory, f"{name}.json")
+        self.max_age = max_age
+
+    def meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def age(self):
+        return time.time() - self.meta().get("synced_at", 0)
+
+    def is_fresh(self):
+        return self.exists() and self.age() < self.max_age
+
+    def version(self):
+        return self.meta().get("version", 0)
+
+    def read(self, columns=None):
+        return pd.read_parquet(self.path, columns=columns)
+
+    def sync(self, fetch, force=False):
+        # `fetch()` returns the complete sheet; the snapshot (and its version) is
+        # only rewritten when the rows actually changed
+        if not force and self.is_fresh():
+            return self.read()
+
+        meta = self.meta()
+        merged = prepare_for_parquet(fetch().dropna(how="all"))
+        digest = _digest(merged)
+
+        if digest != meta.get("digest") or not self.exists():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            merged.to_parquet(tmp, index=False)
+            os.replace(tmp, self.path)
+            meta["version"] = meta.get("version", 0) + 1
+            meta["digest"] = digest
+            meta["rows"] = len(merged)
+
+        meta["synced_at"] = time.time()
+        self._write_meta(meta)
+        return merged
+
+
+def load_leads(conn, worksheet="Leads", snapshot=None, force=False):
+    # Reruns read the local Parquet copy; the sheet is only downloaded once the
+    # freshness window has passed or a refresh is requested.
+    snapshot = snapshot or LeadsSnapshot()
+
+    def fetch():
+        with span("conn.read", worksheet=worksheet):
+            rows = conn.read(worksheet=worksheet, ttl=0)
+        count("sheet_fetches")
+        return rows
+
+    return snapshot.sync(fetch, force=force)
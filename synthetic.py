@@ -0,0 +1,118 @@
+# Synthetic Leads sheets shaped like the "Leads" worksheet, for benchmarks and local runs.
+#   python synthetic.py --rows 1000000 --output .cache/leads.parquet
+import argparse
+
+import numpy as np
+import pandas as pd
+
+LEAD_SOURCES = ["Google", "Facebook", "Bing", "TV", "Radio", "Referral", "Direct Mail",
+                "Instagram", "YouTube", "Affiliate", "Email", "Events"]
+STATES = ["CA", "TX", "FL", "NY", "PA", "IL", "OH", "GA", "NC", "MI", "NJ", "VA", "WA", "AZ",
+          "MA", "TN", "IN", "MO", "MD", "WI", "CO", "MN", "SC", "AL", "LA", "KY", "OR", "OK",
+          "CT", "UT", "IA", "NV", "AR", "MS", "KS", "NM", "NE", "ID", "WV", "HI", "NH", "ME",
+          "MT", "RI", "DE", "SD", "ND", "AK", "VT", "WY"]
+FIRST_NAMES = ["John", "Mary", "James", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+               "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+               "Thomas", "Sarah", "Charles", "Karen", "Daniel", "Nancy", "Matthew", "Lisa"]
+# Spelling variants the duplicate detector should catch
+NAME_VARIANTS = {"John": "Jon", "Sarah": "Sara", "Mary": "Marie", "Susan": "Suzan",
+                 "Jessica": "Jesica", "Thomas": "Tomas", "Karen": "Karin"}
+STAGES = ["New", "Contacted", "Appointment Set", "Closed-Won", "Closed-Lost"]
+STAGE_WEIGHTS = [0.25, 0.25, 0.2, 0.15, 0.15]
+
+
+def generate_leads(rows, seed=0, start="2023-01-01", days=730, duplicate_rate=0.02, sheet_like=True):
+    # sheet_like=True mimics what conn.read returns (text booleans and dates,
+    # mixed-case Stage, stray whitespace) so schema.normalize_leads has real work
+    rng = np.random.default_rng(seed)
+    weights = np.linspace(2, 1, len(LEAD_SOURCES))
+    source = rng.choice(len(LEAD_SOURCES), rows, p=weights / weights.sum())
+    state = rng.integers(0, len(STATES), rows)
+    zip_code = (state * 1000 + 10000 + rng.integers(0, 1000, rows)) % 100000
+    name = rng.integers(0, len(FIRST_NAMES), rows)
+    stage = rng.choice(len(STAGES), rows, p=STAGE_WEIGHTS)
+
+    # Funnel: converted leads set appointments, some of which complete
+    converted = rng.random(rows) < (0.15 + 0.02 * (source % 5))
+    appointments = converted & (rng.random(rows) < 0.6)
+    calls = rng.poisson(2.5, rows).astype(np.int16)
+    cost = np.round(rng.gamma(2.0, 20.0 + 5.0 * (source % 4)), 2)
+
+    created = np.datetime64(start) + rng.integers(0, days, rows).astype("timedelta64[D]")
+    approval = created + rng.integers(1, 90, rows).astype("timedelta64[D]")
+
+    frame = pd.DataFrame({
+        "Lead ID": np.arange(1, rows + 1),
+        "Lead Source": pd.Categorical.from_codes(source, LEAD_SOURCES),
+        "State": pd.Categorical.from_codes(state, STATES),
+        "Zip Code": zip_code.astype(str),
+        "First Name": np.asarray(FIRST_NAMES, dtype=object)[name],
+        "Stage": pd.Categorical.from_codes(stage, STAGES),
+        "Cost": cost,
+        "Converted": converted,
+        "Converted Count": converted.astype(np.int8),
+        "Appointments Completed": appointments.astype(np.int8),
+        "Appointments Completed (Count)": appointments.astype(np.int8),
+        "Number of Outbound Calls": calls,
+        "Created Date": created,
+        "Approval Date": np.where(converted, approval, np.datetime64("NaT")),
+    })
+    frame["Month"] = frame["Created Date"].dt.month
+    frame["Year"] = frame["Created Date"].dt.year
+
+    # Near-duplicates: copy earlier leads with a name variant or stray whitespace
+    n_dupes = int(rows * duplicate_rate)
+    if n_dupes:
+        target = rng.choice(rows, n_dupes, replace=False)
+        origin = rng.integers(0, rows, n_dupes)
+        for col in ["State", "Zip Code", "First Name"]:
+            frame.loc[target, col] = frame[col].to_numpy()[origin]
+        names = frame.loc[target, "First Name"]
+        frame.loc[target, "First Name"] = np.where(
+            rng.random(n_dupes) < 0.5, names.map(lambda n: NAME_VARIANTS.get(n, n)), " " + names + " "
+        )
+
+    if sheet_like:
+        frame["Converted"] = np.where(converted, "TRUE", "FALSE")
+        frame["Stage"] = frame["Stage"].astype(str).where(rng.random(rows) < 0.8, frame["Stage"].astype(str).str.lower())
+        frame["Created Date"] = frame["Created Date"].dt.strftime("%Y-%m-%d")
+        frame["Approval Date"] = frame["Approval Date"].dt.strftime("%Y-%m-%d")
+        for col in ["Lead Source", "State"]:
+            frame[col] = frame[col].astype(str)
+    return frame
+
+
+def write_leads(path, rows, seed=0, chunk_size=1_000_000, **kwargs):
+    # Streams large datasets (up to 10M+ rows) to Parquet one chunk at a time
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for i, first in enumerate(range(0, rows, chunk_size)):
+            chunk = generate_leads(min(chunk_size, rows - first), seed=seed + i, **kwargs)
+            chunk["Lead ID"] += first
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic Leads sheet to Parquet or CSV.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--output", default="leads.parquet")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.output.endswith(".csv"):
+        generate_leads(args.rows, seed=args.seed).to_csv(args.output, index=False)
+    else:
+        write_leads(args.output, args.rows, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# Tests import the top-level modules directly and share one synthetic leads frame
+#   python -m pytest -q tests
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def leads():
+    from schema import normalize_leads
+    from synthetic import generate_leads
+
+    df = normalize_leads(generate_leads(6_000, seed=3))
+    return df.sort_values("Created Date", kind="stable").reset_index(drop=True)
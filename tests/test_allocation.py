@@ -0,0 +1,76 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from allocation import (allocation_grid, bootstrap_cpa, bootstrap_intervals, fit_response_curves,
+                        optimize_allocation, predict_conversions)
+from metrics_cube import build_cube
+
+CURVES = pd.DataFrame({"Lead Source": ["A", "B", "C"], "a": [0.5, 1.2, 0.8], "b": [0.9, 0.4, 0.6]})
+
+
+def _brute_force(curves, steps, step, mins=(0, 0, 0), maxs=(np.inf,) * 3):
+    splits = [split for split in itertools.product(range(steps + 1), repeat=len(curves))
+              if sum(split) == steps
+              and all(lo <= s * step <= hi for s, lo, hi in zip(split, mins, maxs))]
+    return max(predict_conversions(curves, np.array(split, dtype=float) * step).sum() for split in splits)
+
+
+def test_greedy_matches_brute_force():
+    result = optimize_allocation(CURVES, 6_000, 1_000)
+    assert result["Optimized Allocation"].sum() == 6_000
+    assert result["Optimized Predicted Conversions"].sum() == pytest.approx(_brute_force(CURVES, 6, 1_000))
+
+
+def test_greedy_respects_bounds():
+    mins, maxs = [1_000, 0, 0], [np.inf, 2_000, np.inf]
+    result = optimize_allocation(CURVES, 6_000, 1_000, min_spend=mins, max_spend=maxs)
+    allocation = result["Optimized Allocation"].to_numpy()
+    assert (allocation >= mins).all() and (allocation <= maxs).all()
+    assert result["Optimized Predicted Conversions"].sum() == pytest.approx(_brute_force(CURVES, 6, 1_000, mins, maxs))
+
+
+def test_grid_rows_are_optimal_for_every_budget():
+    budgets, allocations = allocation_grid(CURVES, 5_000, 1_000)
+    assert budgets.tolist() == [1_000, 2_000, 3_000, 4_000, 5_000]
+    for k, budget in enumerate(budgets, start=1):
+        assert allocations[k - 1].sum() == budget
+        assert predict_conversions(CURVES, allocations[k - 1]).sum() == pytest.approx(_brute_force(CURVES, k, 1_000))
+
+
+def test_fitted_curves_are_concave(leads):
+    curves = fit_response_curves(build_cube(leads))
+    assert set(curves["Lead Source"]) == set(leads["Lead Source"].dropna())
+    assert curves["b"].between(0.1, 0.95).all()
+    assert (curves["a"] >= 0).all()
+
+
+def _converted(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Lead Source": rng.choice(["A", "B", "C"], n, p=[0.85, 0.1, 0.05]),
+        "Cost": rng.gamma(2.0, 50.0, n),
+        "Converted": rng.random(n) < 0.5,
+        "Converted Count": 1,
+    })
+
+
+def test_small_bootstraps_stay_in_process():
+    df = _converted()
+    sources, serial = bootstrap_cpa(df, n_boot=200, seed=1)
+    _, pooled = bootstrap_cpa(df, n_boot=200, seed=1, max_workers=8)
+    assert sources == ["A", "B", "C"]
+    np.testing.assert_array_equal(serial, pooled)  # a pool would split the seeds
+
+
+def test_intervals_cover_the_point_estimate():
+    df = _converted()
+    sources, cpa = bootstrap_cpa(df, n_boot=500)
+    per_source, totals = bootstrap_intervals(sources, cpa, 10_000)
+    converted = df[df["Converted"]].groupby("Lead Source")
+    point = (converted["Cost"].sum() / converted["Converted Count"].sum()).to_numpy()
+    assert ((per_source["CPA Low"] <= point) & (point <= per_source["CPA High"])).all()
+    low, high = totals["Weighted Predicted Conversions"]
+    assert 0 < low <= high
@@ -0,0 +1,51 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from anomalies import MIN_HISTORY, WINDOW, _nanmedian, detect_anomalies, robust_z
+from metrics_cube import build_cube
+
+
+def test_nanmedian_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(50, 8, 6))
+    values[rng.random(values.shape) < 0.3] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        np.testing.assert_allclose(_nanmedian(values), np.nanmedian(values, axis=-1))
+
+
+def test_robust_z_flags_a_spike_against_trailing_months():
+    rng = np.random.default_rng(1)
+    values = 100 + rng.normal(0, 5, (3, 24))
+    values[1, 20] = 200
+    values[2, :] = np.nan
+    values[2, -1] = 100
+    z, median = robust_z(values)
+    assert np.isnan(z[:, :WINDOW]).all()  # no baseline yet
+    assert z[1, 20] > 5  # scale floored at MAD_FLOOR of the median
+    assert np.abs(np.delete(z[0], np.s_[:WINDOW])).max() < 3.5
+    assert np.isnan(z[2, -1])  # fewer than MIN_HISTORY months observed
+    assert MIN_HISTORY <= WINDOW
+
+
+def test_detect_anomalies_finds_an_injected_cost_spike(leads):
+    spiked = leads.copy()
+    month = spiked["Month-Year"] == "2024-06"
+    source = spiked["Lead Source"] == "Google"
+    spiked.loc[month & source, "Cost"] *= 6
+    alerts = detect_anomalies(build_cube(spiked), min_leads=10)
+    hit = alerts[(alerts["Level"] == "Lead Source") & (alerts["Segment"] == "Google")
+                 & (alerts["Month"] == "2024-06") & (alerts["Metric"] == "Cost")]
+    assert len(hit) == 1 and hit["Direction"].iloc[0] == "spike"
+    assert alerts["Robust Z"].abs().is_monotonic_decreasing
+    baseline = detect_anomalies(build_cube(leads), min_leads=10)
+    assert not ((baseline["Segment"] == "Google") & (baseline["Month"] == "2024-06")
+                & (baseline["Metric"] == "Cost")).any()
+
+
+def test_no_data_gives_an_empty_frame():
+    empty = build_cube(pd.DataFrame(columns=["Lead Source", "State", "Month-Year", "Cost"]))
+    alerts = detect_anomalies(empty)
+    assert alerts.empty and "Robust Z" in alerts.columns
@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("streamlit_gsheets")
+
+from auth_helper import AllowlistCache  # noqa: E402
+
+
+def _slow_loader(calls, emails=("a@x.com",), delay=0.05):
+    def load():
+        calls.append(1)
+        time.sleep(delay)
+        return list(emails)
+    return load
+
+
+def test_concurrent_cold_logins_load_once():
+    calls = []
+    cache = AllowlistCache(loader=_slow_loader(calls))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.contains(" A@x.com "))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [True] * 20
+
+
+def test_stale_list_refreshes_in_background():
+    calls = []
+    cache = AllowlistCache(loader=_slow_loader(calls, delay=0), ttl=0, max_age=60)
+    assert not cache.contains("b@x.com")
+    cache.contains("a@x.com")  # past ttl: served from memory, refreshed behind
+    for _ in range(100):
+        if len(calls) == 2:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 2
+
+
+def test_invalidate_forces_a_blocking_reload():
+    calls = []
+    cache = AllowlistCache(loader=_slow_loader(calls, delay=0))
+    cache.contains("a@x.com")
+    cache.invalidate()
+    assert cache.contains("a@x.com")
+    assert len(calls) == 2
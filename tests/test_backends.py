@@ -0,0 +1,63 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from allocation import CONVERTED_ONLY
+from backends import ParquetBackend, SQLBackend, _type_matches, apply_filters, read_frame
+
+
+@pytest.mark.parametrize("declared, value, pushed", [
+    ("INTEGER", True, True),
+    ("BOOLEAN", True, True),
+    ("TEXT", True, False),
+    ("", True, False),
+    ("REAL", 3, True),
+    ("INTEGER", 2.5, True),
+    ("TEXT", 3, False),
+    ("VARCHAR", "TX", True),
+    ("INTEGER", "TX", False),
+    ("TIMESTAMP", pd.Timestamp("2024-01-01"), True),
+    ("TEXT", pd.Timestamp("2024-01-01"), False),
+])
+def test_type_matches(declared, value, pushed):
+    assert _type_matches(declared, value) is pushed
+
+
+def test_apply_filters():
+    df = pd.DataFrame({"State": ["TX", "CA", None], "Cost": [1.0, 5.0, 3.0]})
+    assert apply_filters(df, [("State", "in", ["TX", "CA"]), ("Cost", ">", 2)])["State"].tolist() == ["CA"]
+    assert apply_filters(df, [("State", "not in", ["TX"])])["Cost"].tolist() == [5.0, 3.0]
+
+
+@pytest.fixture(scope="module")
+def stores(tmp_path_factory):
+    from synthetic import generate_leads
+
+    root = tmp_path_factory.mktemp("backends")
+    raw = generate_leads(3_000, seed=5)  # sheet-like: "TRUE"/"FALSE", text dates
+    raw.to_parquet(root / "leads.parquet", index=False)
+    with sqlite3.connect(root / "text.db") as conn:
+        raw.astype(str).to_sql("leads", conn, index=False)
+    with sqlite3.connect(root / "typed.db") as conn:
+        from schema import normalize_leads
+        normalize_leads(raw).drop(columns=["Month-Year"]).to_sql("leads", conn, index=False)
+    return ParquetBackend(str(root / "leads.parquet")), SQLBackend(str(root / "text.db")), \
+        SQLBackend(str(root / "typed.db"))
+
+
+@pytest.mark.parametrize("filters", [
+    CONVERTED_ONLY,
+    [("Created Date", ">=", pd.Timestamp("2024-01-01")), ("Lead Source", "in", ["Google", "TV"])],
+    [("Cost", "<", 30), ("State", "not in", ["TX"])],
+])
+def test_sql_backends_match_parquet(stores, filters):
+    parquet, text, typed = stores
+    expected = read_frame(parquet, ["Lead Source", "Cost"], filters)["Lead ID"].tolist()
+    for backend in (text, typed):
+        assert read_frame(backend, ["Lead Source", "Cost"], filters)["Lead ID"].astype(int).tolist() == expected
+
+
+def test_typed_columns_are_pushed_down(stores):
+    _, text, typed = stores
+    assert len(typed.read(["Lead ID"], CONVERTED_ONLY)) < len(text.read(["Lead ID"], CONVERTED_ONLY)) == 3_000
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from cohorts import DIMENSIONS, CohortCube, build_cohorts
+
+
+def _assert_same(cube, full):
+    for dim in DIMENSIONS:
+        for segment in [None] + full.segments[dim]:
+            pd.testing.assert_frame_equal(cube.matrix(dim, segment), full.matrix(dim, segment))
+        pd.testing.assert_frame_equal(
+            cube.lag_quantiles(dim).sort_values(dim).reset_index(drop=True),
+            full.lag_quantiles(dim).sort_values(dim).reset_index(drop=True))
+
+
+def test_hand_built_cohorts():
+    rows = pd.DataFrame({
+        "Lead Source": ["A", "A", "B", "A"],
+        "State": ["TX", "TX", "CA", "CA"],
+        "Created Date": pd.to_datetime(["2024-01-03", "2024-01-20", "2024-02-01", "2024-02-05"]),
+        "Approval Date": pd.to_datetime(["2024-01-05", "2024-03-01", None, "2024-02-06"]),
+        "Converted Count": [1, 1, 0, 1],
+    })
+    cube = build_cohorts(rows)
+    matrix = cube.matrix("Lead Source", "A")
+    assert matrix.index.tolist() == ["2024-01", "2024-02"]
+    assert matrix["Leads"].tolist() == [2, 1]
+    assert matrix.loc["2024-01", "0-6d"] == 1 and matrix.loc["2024-01", "35-41d"] == 1
+    curve = cube.conversion_curve("Lead Source", "A")
+    assert curve.groupby("Cohort")["Converted (%)"].max().tolist() == [100.0, 100.0]
+    assert cube.matrix("Lead Source", "B").drop(columns="Leads").to_numpy().sum() == 0
+
+
+def test_appended_months_match_rebuild(leads):
+    cut = leads["Created Date"] < leads["Created Date"].quantile(0.7)
+    cube = CohortCube().sync(leads[cut])
+    cube.sync(leads)
+    assert cube.updated < cube.months  # earlier months were reused
+    _assert_same(cube, build_cohorts(leads))
+
+
+def test_rows_edited_in_place_match_rebuild(leads):
+    cube = CohortCube().sync(leads)
+    edited = leads.copy()
+    edited.loc[:99, "Approval Date"] = edited.loc[:99, "Approval Date"] + pd.Timedelta(days=60)
+    cube.sync(edited)
+    assert 0 < cube.updated < cube.months
+    _assert_same(cube, build_cohorts(edited))
+
+
+def test_copy_is_detached(leads):
+    cube = CohortCube().sync(leads.iloc[:3_000])
+    snapshot = cube.copy()
+    before = snapshot.leads["State"].copy()
+    cube.sync(leads)
+    np.testing.assert_array_equal(snapshot.leads["State"], before)
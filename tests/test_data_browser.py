@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from data_browser import match_positions, page_count, page_slice
+
+
+def _frame():
+    return pd.DataFrame({
+        "Lead ID": [1, 2, 3, 4, 5],
+        "First Name": ["Ann", "bob", None, "Annie", "Cal"],
+        "State": pd.Categorical(["TX", "CA", "TX", "NY", "TX"]),
+        "Cost": [30.0, 10.0, np.nan, 20.0, 5.0],
+    })
+
+
+def test_search_matches_text_and_categories_case_insensitively():
+    df = _frame()
+    assert match_positions(df, "ann").tolist() == [0, 3]
+    assert match_positions(df, " tx ").tolist() == [0, 2, 4]
+    assert match_positions(df, "").tolist() == [0, 1, 2, 3, 4]
+
+
+def test_filters_and_sort():
+    df = _frame()
+    positions = match_positions(df, filters={"State": ["TX"], "Lead ID": []}, sort_by="Cost")
+    assert positions.tolist() == [4, 0, 2]  # NaN sorts last
+    assert match_positions(df, sort_by="Cost", ascending=False).tolist() == [0, 3, 1, 4, 2]
+
+
+def test_pages_are_clamped_and_projected():
+    df = _frame()
+    page, total = page_slice(df, columns=["Lead ID"], page=9, page_size=2)
+    assert total == 5 and page_count(total, 2) == 3
+    assert list(page.columns) == ["Lead ID"]
+    assert page["Lead ID"].tolist() == [5]
+    empty, total = page_slice(df, search="nobody")
+    assert total == 0 and empty.empty
+
+
+def test_mixed_sheet_column_sorts_as_text():
+    df = pd.DataFrame({"Zip Code": [12345, "A1", 99]})
+    assert match_positions(df, sort_by="Zip Code").tolist() == [0, 2, 1]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from dedupe import DuplicateIndex, _connected_labels, jaro_winkler, soundex
+
+
+def test_name_similarity():
+    assert soundex("robert") == soundex("rupert") == "R163"
+    assert jaro_winkler("martha", "marhta") > 0.96
+    assert jaro_winkler("mary", "zed") < 0.5
+
+
+def test_fuzzy_and_phonetic_names_group_within_a_block():
+    rows = pd.DataFrame({
+        "Lead ID": [1, 2, 3, 4, 5],
+        "First Name": ["Mary", "Marie", "Mary", "Mary", "John"],
+        "Zip Code": ["12345", "12345", "12345.0", "99999", "12345"],
+        "State": ["TX", "tx", "TX", "TX", "TX"],
+    })
+    groups = DuplicateIndex().add(rows).groups()
+    assert groups[0] == groups[1] == groups[2]
+    assert groups[3:].isna().all()  # other zip; other initial
+
+
+def test_connected_labels_match_graph_search():
+    rng = np.random.default_rng(0)
+    n = 200
+    left, right = rng.integers(0, n, 150), rng.integers(0, n, 150)
+    labels = _connected_labels(n, left, right)
+    neighbours = {i: set() for i in range(n)}
+    for a, b in zip(left, right):
+        neighbours[a].add(b)
+        neighbours[b].add(a)
+    for start in range(n):
+        seen, stack = {start}, [start]
+        while stack:
+            for nxt in neighbours[stack.pop()] - seen:
+                seen.add(nxt)
+                stack.append(nxt)
+        assert labels[start] == min(seen)
+
+
+def test_appended_rows_match_rebuild(leads):
+    index = DuplicateIndex().sync(leads.iloc[:4_000])
+    index.sync(leads)
+    pd.testing.assert_series_equal(index.groups(), DuplicateIndex().add(leads).groups())
+
+
+def test_edited_rows_match_rebuild(leads):
+    index = DuplicateIndex().sync(leads)
+    for edit in ({"First Name": "Zed"}, {"Zip Code": "00001"}):
+        edited = leads.assign(**edit)
+        pd.testing.assert_series_equal(index.sync(edited).groups(), DuplicateIndex().add(edited).groups())
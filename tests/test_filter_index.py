@@ -0,0 +1,54 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from cost_forecasting import INPUT_COLUMNS, forecast_cost, forecast_segments
+from filter_index import DATE_COLUMN, LeadIndex, selection_key
+
+
+def _masked(df, selection):
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in selection.items():
+        if col == DATE_COLUMN:
+            start, end = values
+            dates = df[col]
+            mask &= (dates >= pd.Timestamp(start)).to_numpy() & (dates < pd.Timestamp(end) + pd.Timedelta(days=1)).to_numpy()
+        else:
+            mask &= df[col].isin(values).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def test_select_matches_boolean_masks(leads):
+    index = LeadIndex(leads)
+    rng = np.random.default_rng(4)
+    sources, states, stages = (index.values(col) for col in ("Lead Source", "State", "Stage"))
+    for _ in range(25):
+        selection = {}
+        if rng.random() < 0.7:
+            selection["Lead Source"] = list(rng.choice(sources, rng.integers(1, 4), replace=False))
+        if rng.random() < 0.5:
+            selection["State"] = list(rng.choice(states, rng.integers(1, 6), replace=False))
+        if rng.random() < 0.5:
+            selection["Stage"] = list(rng.choice(stages, rng.integers(1, 3), replace=False))
+        if rng.random() < 0.5:
+            start = pd.Timestamp("2023-01-01") + pd.Timedelta(days=int(rng.integers(0, 500)))
+            selection[DATE_COLUMN] = (start.date(), (start + pd.Timedelta(days=int(rng.integers(0, 200)))).date())
+        np.testing.assert_array_equal(index.select(selection), _masked(leads, selection))
+
+
+def test_unknown_values_select_nothing(leads):
+    assert len(LeadIndex(leads).select({"Lead Source": ["Nope"]})) == 0
+
+
+def test_selection_key_ignores_the_full_date_range():
+    full = (datetime.date(2023, 1, 1), datetime.date(2024, 12, 31))
+    assert selection_key(dates=full, date_range=full) == ()
+    assert selection_key(["TV"], (), (), (full[0],), full) == (("Lead Source", ("TV",)), (DATE_COLUMN, (full[0], None)))
+
+
+def test_empty_selection_forecasts_nothing():
+    empty = pd.DataFrame(columns=INPUT_COLUMNS)
+    assert forecast_cost(empty) == []
+    assert forecast_cost(empty, engine="prophet") == []
+    assert forecast_segments(empty).empty
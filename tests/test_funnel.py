@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from funnel import funnel_kpis, funnel_table, safe_ratio
+from metrics_cube import build_cube
+
+
+def test_safe_ratio_is_nan_for_zero_denominators():
+    out = safe_ratio([1, 2, 0], [4, 0, 0], 100)
+    assert out[0] == 25.0
+    assert np.isnan(out[1:]).all()
+
+
+def test_hand_computed_rows():
+    rows = pd.DataFrame({
+        "Lead Source": pd.Categorical(["A", "A", "A", "B"]),
+        "Converted Count": [1, 1, 0, 0],
+        "Appointments Completed (Count)": [1, 0, 0, 0],
+        "Closed-Won": [True, False, False, False],
+        "Cost": [100.0, 50.0, 50.0, 20.0],
+    })
+    table = funnel_table(rows, ["Lead Source"]).set_index("Lead Source")
+    a, b = table.loc["A"], table.loc["B"]
+    assert a["Total_Leads"] == 3 and a["Conversions"] == 2
+    assert a["Lead to Set (%)"] == 66.67
+    assert a["Set to Sit (%)"] == 50.0
+    assert a["Sit to Closed-Won (%)"] == 100.0
+    assert a["Net Pull Through (%)"] == 33.33
+    assert a["CPA"] == 100.0 and a["CPL"] == 66.67
+    assert np.isnan(b["CPA"]) and np.isnan(b["Set to Sit (%)"])
+
+
+def test_cube_and_rows_give_the_same_funnel(leads):
+    cube = build_cube(leads)
+    for by in (["Lead Source"], ["State", "Month-Year"]):
+        from_rows = funnel_table(leads, by).sort_values(by).reset_index(drop=True)
+        from_cube = funnel_table(cube, by).sort_values(by).reset_index(drop=True)
+        columns = [*by, "Total_Leads", "Conversions", "Net Pull Through (%)", "CPA", "CPL"]
+        pd.testing.assert_frame_equal(from_rows[columns], from_cube[columns], check_dtype=False, atol=0.011,
+                                      check_categorical=False)
+    assert funnel_kpis(cube)["Total_Leads"] == len(leads)
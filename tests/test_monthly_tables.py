@@ -0,0 +1,49 @@
+import io
+
+import pandas as pd
+import pytest
+
+from funnel import TABLE_COLUMNS, funnel_table
+from metrics_cube import build_cube
+from monthly_tables import monthly_table
+
+
+@pytest.fixture(scope="module")
+def cube(leads):
+    return build_cube(leads)
+
+
+def test_groups_match_the_funnel_table(cube):
+    table = monthly_table(cube, "Lead Source")
+    expected = funnel_table(cube, ["Lead Source", "Month-Year"])
+    assert table.labels == sorted(expected["Lead Source"].dropna().astype(str).unique())
+    assert table.sizes().sum() == len(expected.dropna(subset=["Lead Source", "Month-Year"]))
+    for label in table.labels[:3]:
+        group = table.group(label)
+        rows = expected[expected["Lead Source"].astype(str) == label].sort_values("Month-Year")
+        assert group["Month-Year"].tolist() == rows["Month-Year"].astype(str).tolist()
+        pd.testing.assert_frame_equal(group[TABLE_COLUMNS], rows[TABLE_COLUMNS].reset_index(drop=True),
+                                      check_dtype=False)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_chunked_exports_round_trip(cube, fmt):
+    table = monthly_table(cube, "State")
+    data = table.export(fmt, rows=7)
+    if fmt == "csv":
+        exported = pd.read_csv(io.BytesIO(data), dtype={"Month-Year": str})
+    else:
+        exported = pd.read_parquet(io.BytesIO(data))
+    assert len(exported) == len(table.frame)
+    assert exported["State"].astype(str).tolist() == table.frame["State"].tolist()
+    pd.testing.assert_series_equal(exported["Total_Leads"], table.frame["Total_Leads"].reset_index(drop=True),
+                                   check_dtype=False)
+
+
+def test_export_to_path_and_unknown_format(cube, tmp_path):
+    table = monthly_table(cube, "State")
+    path = tmp_path / "monthly.csv"
+    assert table.export("csv", str(path)) is None
+    assert path.read_text().count("\n") == len(table.frame) + 1
+    with pytest.raises(ValueError):
+        table.export("xlsx")
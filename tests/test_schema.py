@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from schema import normalize_leads, to_bool, to_category, to_count
+
+
+def test_case_variants_fold_onto_the_most_common_spelling():
+    stages = pd.Series(["Closed-Won", "closed-won", " Closed-Won ", "New", None, "NEW", "New"])
+    folded = to_category(stages)
+    assert list(folded.cat.categories) == ["Closed-Won", "New"]
+    assert folded.tolist()[:4] == ["Closed-Won", "Closed-Won", "Closed-Won", "New"]
+    assert pd.isna(folded.iloc[4])
+    assert folded.iloc[5] == "New"
+
+
+def test_distinct_values_keep_their_spelling():
+    sources = to_category(pd.Series(["TV", "Google", "TV", None]))
+    assert list(sources.cat.categories) == ["Google", "TV"]
+    assert sources.isna().sum() == 1
+
+
+def test_sheet_booleans_and_counts():
+    assert to_bool(pd.Series(["TRUE", " true ", "False", None])).tolist() == [True, True, False, False]
+    assert to_bool(pd.Series([1, 0, np.nan])).tolist() == [True, False, False]
+    assert to_count(pd.Series(["2", "", "x", 3])).tolist() == [2, 0, 0, 3]
+
+
+def test_normalize_adds_derived_columns():
+    df = normalize_leads(pd.DataFrame({
+        "Stage": ["closed-won", "Closed-Won", "New"],
+        "Created Date": ["2024-01-05", "2024-02-10", "bad"],
+    }))
+    assert df["Closed-Won"].tolist() == [True, True, False]
+    assert df["Month-Year"].astype(object).tolist()[:2] == ["2024-01", "2024-02"]
+    assert pd.isna(df["Month-Year"].iloc[2])
@@ -0,0 +1,83 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from allocation import ALLOCATION_COLUMNS, CONVERTED_ONLY
+from backends import ParquetBackend, read_frame
+from cohorts import COHORT_COLUMNS
+from metrics_cube import CUBE_COLUMNS
+from shared_data import SharedDataset, covers
+
+
+@pytest.fixture(scope="module")
+def backend(tmp_path_factory):
+    from synthetic import generate_leads
+
+    path = tmp_path_factory.mktemp("shared") / "leads.parquet"
+    generate_leads(2_000, seed=4).to_parquet(path, index=False)
+    return ParquetBackend(str(path))
+
+
+def _key(columns, filters=None):
+    return (None if columns is None else tuple(columns), None if filters is None else tuple(map(tuple, filters)))
+
+
+def _loader(backend, key, calls):
+    def load():
+        calls.append(key)
+        return read_frame(backend, *key)
+    return load
+
+
+def _same(a, b):
+    pd.testing.assert_frame_equal(a[sorted(a.columns)], b[sorted(b.columns)])
+
+
+def test_covers():
+    assert covers(_key(None), _key(CUBE_COLUMNS))
+    assert covers(_key(CUBE_COLUMNS), _key(["State", "Month-Year"]))  # Month-Year comes from Created Date
+    assert not covers(_key(["State"]), _key(CUBE_COLUMNS))
+    assert not covers(_key(None, CONVERTED_ONLY), _key(["State"]))
+
+
+def test_projections_are_sliced_from_the_full_frame(backend):
+    dataset, calls = SharedDataset(), []
+    full = _key(None)
+    dataset.get("s", 1, full, _loader(backend, full, calls))
+    for key in (_key(CUBE_COLUMNS), _key(COHORT_COLUMNS), _key(ALLOCATION_COLUMNS, CONVERTED_ONLY)):
+        _same(dataset.get("s", 1, key, _loader(backend, key, calls)), read_frame(backend, *key))
+    assert calls == [full]
+    assert dataset.usage("s")[0] == 1
+
+
+def test_wider_frame_replaces_the_narrower_ones(backend):
+    dataset, calls = SharedDataset(), []
+    narrow, wide = _key(["State"]), _key(CUBE_COLUMNS)
+    dataset.get("s", 1, narrow, _loader(backend, narrow, calls))
+    dataset.get("s", 1, wide, _loader(backend, wide, calls))
+    assert dataset.usage("s")[0] == 1
+    _same(dataset.get("s", 1, narrow, _loader(backend, narrow, calls)), read_frame(backend, *narrow))
+    assert calls == [narrow, wide]
+
+
+def test_views_are_private_and_versions_replace_frames(backend):
+    dataset, calls = SharedDataset(), []
+    key = _key(CUBE_COLUMNS)
+    first = dataset.get("s", 1, key, _loader(backend, key, calls))
+    first["Cost"] = 0.0
+    assert dataset.get("s", 1, key, _loader(backend, key, calls))["Cost"].sum() > 0
+    dataset.get("s", 2, key, _loader(backend, key, calls))
+    assert len(calls) == 2 and dataset.usage("s")[0] == 1
+
+
+def test_concurrent_sessions_load_once(backend):
+    dataset, calls = SharedDataset(), []
+    key = _key(None)
+    threads = [threading.Thread(target=dataset.get, args=("s", 1, key, _loader(backend, key, calls)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [key]
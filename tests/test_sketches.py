@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import CountMin, HyperLogLog, SketchIndex, TDigest, build_sketch
+
+QUANTILES = np.array([0.1, 0.5, 0.9])
+
+
+def _assert_same(synced, full):
+    assert synced.rows == full.rows
+    np.testing.assert_array_equal(synced.leads.registers, full.leads.registers)
+    np.testing.assert_array_equal(synced.contacts.registers, full.contacts.registers)
+    for col, sketch in synced.counts.items():
+        np.testing.assert_array_equal(sketch.table, full.counts[col].table)
+        assert sketch.candidates == full.counts[col].candidates
+    np.testing.assert_allclose(synced.days.quantile(QUANTILES), full.days.quantile(QUANTILES))
+    assert synced.days.mean() == full.days.mean()
+
+
+def test_appended_chunks_match_rebuild(leads):
+    index = SketchIndex(chunk_rows=1_000)
+    index.sync(leads.iloc[:3_500])
+    synced = index.sync(leads)
+    assert index.sketched == 3  # the partial chunk plus two new ones
+    _assert_same(synced, build_sketch(leads, chunk_rows=1_000))
+
+
+def test_rows_edited_in_place_are_resketched(leads):
+    index = SketchIndex(chunk_rows=1_000)
+    index.sync(leads)
+    edited = leads.assign(**{
+        "Approval Date": leads["Approval Date"] + pd.Timedelta(days=100),
+        "Lead Source": leads["Lead Source"].cat.rename_categories(lambda source: f"{source} 2"),
+    })
+    synced = index.sync(edited)
+    assert index.sketched == 6
+    _assert_same(synced, build_sketch(edited, chunk_rows=1_000))
+    assert synced.days.mean() > build_sketch(leads).days.mean() + 99
+
+    late = edited.copy()
+    late.loc[4_500, "Converted Count"] = 1 - late.loc[4_500, "Converted Count"]
+    index.sync(late)
+    assert index.sketched == 1  # only the chunk holding the converted lead
+
+
+def test_hyperloglog_within_error():
+    for n in (500, 50_000, 400_000):
+        hll = HyperLogLog().add(np.arange(n))
+        assert abs(hll.estimate() - n) <= 1.5 * hll.relative_error() * n  # 3 standard errors
+
+
+def test_count_min_bounds():
+    rng = np.random.default_rng(1)
+    values = rng.zipf(1.5, 50_000) % 5_000
+    sketch = CountMin(width=512)
+    for part in np.array_split(values.astype(str), 4):
+        sketch.merge(CountMin(width=512).add(part))
+    exact = pd.Series(values.astype(str)).value_counts()
+    estimate = sketch.estimate(exact.index.to_numpy(dtype=object))
+    assert (estimate >= exact.to_numpy()).all()
+    assert np.mean(estimate - exact.to_numpy() <= sketch.error()) >= sketch.confidence() - 0.01
+    top = sketch.heavy_hitters(5)["value"].tolist()
+    assert top[:3] == exact.index[:3].tolist()
+
+
+def test_tdigest_quantiles_within_rank_error():
+    rng = np.random.default_rng(2)
+    values = rng.gamma(2.0, 20.0, 100_000)
+    digest = TDigest()
+    for part in np.array_split(values, 10):
+        digest.merge(TDigest().add(part))
+    assert digest.mean() == pytest.approx(values.mean())  # centroids keep the exact sum
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        low, _, high = digest.interval(q)
+        assert low <= np.quantile(values, q) <= high
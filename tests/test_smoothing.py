@@ -0,0 +1,32 @@
+import numpy as np
+
+from smoothing import forecast_batch
+
+
+def test_shapes_and_bands():
+    y = np.random.default_rng(0).gamma(5, 100, (4, 30))
+    yhat, lower, upper = forecast_batch(y, periods=3)
+    assert yhat.shape == lower.shape == upper.shape == (4, 3)
+    assert (lower <= yhat).all() and (yhat <= upper).all()
+    assert (np.diff(upper - lower, axis=1) >= 0).all()  # bands widen with the horizon
+
+
+def test_linear_trend_is_extrapolated():
+    y = 100 + 10 * np.arange(12, dtype=float)[None, :]
+    yhat, _, _ = forecast_batch(y, periods=3)
+    np.testing.assert_allclose(yhat[0], [220, 230, 240], rtol=1e-6)
+
+
+def test_seasonal_pattern_is_repeated():
+    pattern = np.array([5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 9], dtype=float) * 100
+    y = np.tile(pattern, 3)[None, :]
+    yhat, _, _ = forecast_batch(y, periods=12)
+    np.testing.assert_allclose(yhat[0], pattern, rtol=0.05)
+
+
+def test_batch_matches_series_one_at_a_time():
+    y = np.random.default_rng(1).gamma(5, 100, (3, 26))
+    y[1, :5] = np.nan  # missing months count as zero
+    together = forecast_batch(y, periods=2)[0]
+    alone = np.vstack([forecast_batch(y[i:i + 1], periods=2)[0] for i in range(3)])
+    np.testing.assert_allclose(together, alone)
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from snapshot import LeadsSnapshot
+
+
+def _fetcher(frames):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return frames[min(len(calls), len(frames)) - 1]
+    return fetch, calls
+
+
+def test_sync_reuses_fresh_snapshot(tmp_path):
+    snapshot = LeadsSnapshot(directory=str(tmp_path), max_age=60)
+    fetch, calls = _fetcher([pd.DataFrame({"Lead ID": [1, 2], "Zip Code": [12345, "A1"]})])
+    first = snapshot.sync(fetch)
+    again = snapshot.sync(fetch)
+    assert len(calls) == 1
+    assert snapshot.version() == 1
+    assert again["Zip Code"].tolist() == ["12345", "A1"]  # mixed column stored as text
+    assert first["Lead ID"].tolist() == again["Lead ID"].tolist()
+
+
+def test_version_changes_only_with_the_rows(tmp_path):
+    snapshot = LeadsSnapshot(directory=str(tmp_path), max_age=0)
+    rows = pd.DataFrame({"Lead ID": [1, 2], "Stage": ["New", "Won"]})
+    edited = rows.assign(Stage=["New", "Lost"])
+    fetch, calls = _fetcher([rows, rows, edited])
+    snapshot.sync(fetch)
+    snapshot.sync(fetch)
+    assert snapshot.version() == 1
+    snapshot.sync(fetch)
+    assert len(calls) == 3
+    assert snapshot.version() == 2
+    assert snapshot.read()["Stage"].tolist() == ["New", "Lost"]
+
+
+def test_blank_rows_are_dropped(tmp_path):
+    snapshot = LeadsSnapshot(directory=str(tmp_path))
+    fetch, _ = _fetcher([pd.DataFrame({"Lead ID": [1, None], "Stage": ["New", None]})])
+    assert len(snapshot.sync(fetch)) == 1
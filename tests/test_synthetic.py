@@ -0,0 +1,33 @@
+import pandas as pd
+
+from dedupe import DuplicateIndex
+from schema import normalize_leads
+from synthetic import generate_leads, write_leads
+
+
+def test_generation_is_deterministic():
+    pd.testing.assert_frame_equal(generate_leads(500, seed=7), generate_leads(500, seed=7))
+    assert not generate_leads(500, seed=7).equals(generate_leads(500, seed=8))
+
+
+def test_sheet_like_rows_normalize_cleanly():
+    df = normalize_leads(generate_leads(2_000, seed=1))
+    assert len(df) == 2_000 and df["Lead ID"].is_unique
+    assert df["Converted"].dtype == bool
+    assert (df.loc[df["Converted"], "Approval Date"] > df.loc[df["Converted"], "Created Date"]).all()
+    assert df.loc[~df["Converted"], "Approval Date"].isna().all()
+    # Lower-cased stages fold back onto the canonical spelling
+    assert df["Stage"].cat.categories.str.lower().is_unique
+
+
+def test_planted_duplicates_are_found():
+    df = generate_leads(5_000, seed=2, duplicate_rate=0.02, sheet_like=False)
+    assert DuplicateIndex().add(df).duplicate_mask().sum() >= 100
+
+
+def test_write_leads_streams_chunks(tmp_path):
+    path = str(tmp_path / "leads.parquet")
+    write_leads(path, 2_500, chunk_size=1_000)
+    df = pd.read_parquet(path)
+    assert len(df) == 2_500
+    assert df["Lead ID"].tolist() == list(range(1, 2_501))
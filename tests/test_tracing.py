@@ -0,0 +1,71 @@
+import gc
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture(autouse=True)
+def no_tracer():
+    yield
+    if tracing.current() is not None:
+        tracing.current().finish()
+
+
+def test_spans_nest_and_are_no_ops_without_a_tracer():
+    with tracing.span("outside") as record:
+        assert record == {}
+    tracer = tracing.start()
+    with tracing.span("outer"):
+        with tracing.span("inner", rows=3):
+            tracing.count("hits", 2)
+    tracer.finish()
+    assert [(s["name"], s["depth"]) for s in tracer.spans] == [("outer", 0), ("inner", 1)]
+    assert tracer.spans[1]["rows"] == 3 and tracer.counters == {"hits": 2}
+    assert tracing.current() is None
+
+
+def test_memory_tracing_stops_with_the_last_tracer():
+    assert not tracemalloc.is_tracing()
+    first = tracing.Tracer(memory=True)
+    other = threading.Thread(target=lambda: tracing.start(memory=True).finish())
+    other.start()
+    other.join()
+    assert tracemalloc.is_tracing()  # `first` is still open
+    with first.span("alloc"):
+        block = bytearray(4 * 2**20)
+    assert first.spans[0]["peak_mb"] >= 3.9
+    del block
+    first.finish()
+    assert not tracemalloc.is_tracing()
+
+
+def test_unfinished_memory_tracers_release_on_collection():
+    tracing.start(memory=True)
+    tracing.start()  # finishes the one left on this thread
+    assert not tracemalloc.is_tracing()
+    tracer = tracing.Tracer(memory=True)
+    del tracer
+    gc.collect()
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracemalloc_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        tracing.Tracer(memory=True).finish()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_trace_file_is_opt_in(tmp_path):
+    tracer = tracing.start().finish()
+    tracer.write(path=None, page="x")  # default when LEADS_TRACE_FILE is unset
+    path = tmp_path / "traces.jsonl"
+    tracer.write(path=str(path), page="x")
+    line = json.loads(path.read_text())
+    assert line["page"] == "x" and line["spans"] == []
@@ -0,0 +1,139 @@
+# Per-rerun timing/memory spans. Each Streamlit session runs its script on its
+# own thread, so the active tracer is thread-local; span()/count() are no-ops
+# when no tracer is active (background threads, worker processes, reports.py).
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager, nullcontext
+
+TRACE_FILE = os.environ.get("LEADS_TRACE_FILE")  # JSONL sink; off unless set (it grows every rerun)
+TRACE_MEMORY = os.environ.get("LEADS_TRACE_MEMORY", "0") == "1"
+
+_local = threading.local()
+_memory_lock = threading.Lock()
+_memory = {"tracers": 0, "owned": False}  # live memory tracers; whether we started tracemalloc
+
+
+def _trace_memory():
+    with _memory_lock:
+        _memory["tracers"] += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memory["owned"] = True
+
+
+def _untrace_memory():
+    # tracemalloc slows every allocation, so it stops with the last memory
+    # tracer (unless something else, e.g. the benchmarks, started it)
+    with _memory_lock:
+        _memory["tracers"] -= 1
+        if not _memory["tracers"] and _memory["owned"]:
+            tracemalloc.stop()
+            _memory["owned"] = False
+
+
+class Tracer:
+    def __init__(self, counters=None, memory=TRACE_MEMORY):
+        self.counters = counters if counters is not None else {}  # outlive the rerun (session state)
+        self.memory = memory
+        self.spans = []
+        self._stack = []
+        self._started = time.perf_counter()
+        self.seconds = None
+        self._release = None
+        if memory:
+            _trace_memory()
+            # Runs once: from finish(), or when a tracer that never finished
+            # (st.stop, an exception) is collected
+            self._release = weakref.finalize(self, _untrace_memory)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        record = {"name": name, "depth": len(self._stack),
+                  "start_ms": round((time.perf_counter() - self._started) * 1000, 2), **attrs}
+        self.spans.append(record)
+        if self.memory:
+            # Peaks are tracked per open span; tracemalloc is process-wide, so
+            # concurrent sessions show up in each other's numbers
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+            tracemalloc.reset_peak()
+            record["_base"] = record["_peak"] = current
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+            self._stack.pop()
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(record.pop("_peak"), peak)
+                base = record.pop("_base")
+                record["mem_mb"] = round((current - base) / 2**20, 2)
+                record["peak_mb"] = round((peak - base) / 2**20, 2)
+                if self._stack:
+                    self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+                tracemalloc.reset_peak()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._started
+        if self._release is not None:
+            self._release()
+            self.memory = False
+        if getattr(_local, "tracer", None) is self:
+            _local.tracer = None
+        return self
+
+    def write(self, path=TRACE_FILE, **context):
+        # One JSON line per rerun; a no-op without LEADS_TRACE_FILE
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        line = {"ts": time.time(), "seconds": round(self.seconds or 0, 4), **context,
+                "counters": self.counters, "spans": self.spans}
+        with open(path, "a") as f:
+            f.write(json.dumps(line, default=str) + "\n")
+
+
+def start(counters=None, memory=TRACE_MEMORY):
+    previous = current()
+    if previous is not None:
+        previous.finish()
+    _local.tracer = Tracer(counters, memory)
+    return _local.tracer
+
+
+def current():
+    return getattr(_local, "tracer", None)
+
+
+def span(name, **attrs):
+    tracer = current()
+    return tracer.span(name, **attrs) if tracer else nullcontext({})
+
+
+def count(name, n=1):
+    tracer = current()
+    if tracer:
+        tracer.count(name, n)
+
+
+def traced(name=None):
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
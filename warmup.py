@@ -0,0 +1,60 @@
+# Work started while the login form is on screen, so the first dashboard render
+# after login is served from warm caches. One warm-up runs per process at a
+# time; its steps go to the same trace file as reruns (LEADS_TRACE_FILE).
+import importlib
+import threading
+import time
+
+import tracing
+
+HEAVY_MODULES = ("pyarrow.parquet", "plotly.express", "prophet")
+MIN_INTERVAL = 60  # seconds between warm-ups started from login screens
+
+_lock = threading.Lock()
+_state = {"thread": None, "started": 0.0, "error": None, "spans": []}
+
+
+def preimport(modules=HEAVY_MODULES):
+    # Optional modules that are missing are simply skipped
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _run(steps):
+    tracer = tracing.start()
+    try:
+        for name, step in steps:
+            with tracer.span(name):
+                step()
+    except Exception as exc:
+        # The dashboard repeats every step on demand, so a failed warm-up only
+        # costs the head start
+        _state["error"] = f"{name}: {exc!r}"
+    finally:
+        tracer.finish()
+        _state["spans"] = tracer.spans
+        tracer.write(session="warmup")
+
+
+def start(steps, min_interval=MIN_INTERVAL):
+    # steps: [(name, callable)] run in order on a daemon thread
+    with _lock:
+        thread = _state["thread"]
+        if thread is not None and (thread.is_alive() or time.monotonic() - _state["started"] < min_interval):
+            return thread
+        thread = threading.Thread(target=_run, args=(list(steps),), name="leads-warmup", daemon=True)
+        _state.update(thread=thread, started=time.monotonic(), error=None, spans=[])
+        thread.start()
+        return thread
+
+
+def status():
+    thread = _state["thread"]
+    return {
+        "running": thread is not None and thread.is_alive(),
+        "error": _state["error"],
+        "spans": list(_state["spans"]),
+    }